@@ -0,0 +1,185 @@
+"""
+Content-addressed upload storage: files sharded by SHA-256, reference counted, swept by quota
+"""
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict
+
+from backend.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    blob_id TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    evicted_at REAL
+);
+CREATE INDEX IF NOT EXISTS blobs_last_used ON blobs (last_used);
+"""
+
+# Partial uploads older than this are assumed abandoned by a crashed worker
+_INCOMING_TTL_SECONDS = 3600
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """Uploaded files stored once per content under ``root/ab/cd/<sha256><ext>``.
+
+    Each contract holds a reference; the file is removed when the last one is
+    released. ``sweep`` evicts files unused for ``max_age_seconds`` and then the
+    least recently used ones until the total is within ``max_bytes`` (0 turns
+    either quota off). Evicted blobs keep their row and references, so the
+    contracts' text and analyses stay available and a later upload of the same
+    file simply restores it.
+    """
+
+    def __init__(self, root: Path, db_path: Path, max_age_seconds: float = 0, max_bytes: int = 0):
+        self.root = root
+        self.incoming = root / ".incoming"
+        self.db_path = db_path
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.incoming.mkdir(parents=True, exist_ok=True)
+        connect(db_path).executescript(_SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    @staticmethod
+    def blob_id(sha256: str, extension: str) -> str:
+        return f"{sha256}{extension.lower()}"
+
+    def path(self, blob_id: str) -> Path:
+        return self.root / blob_id[:2] / blob_id[2:4] / blob_id
+
+    def temp_path(self, extension: str = "") -> Path:
+        """Scratch file for an upload in progress; hand it to ``put`` once its hash is known."""
+        return self.incoming / f"{uuid.uuid4().hex}{extension.lower()}.part"
+
+    def put(self, src: Path, sha256: str, extension: str, copy: bool = False) -> Path:
+        """Take one reference to the content of ``src`` and return its stored path.
+
+        ``src`` is moved into place (or copied with ``copy=True``); when the
+        content is already stored it is discarded instead.
+        """
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            dest = self.put_in(db, src, sha256, extension, copy)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return dest
+
+    def put_in(self, db: sqlite3.Connection, src: Path, sha256: str, extension: str, copy: bool = False) -> Path:
+        """``put`` inside the caller's transaction on a connection to this store's database."""
+        blob_id = self.blob_id(sha256, extension)
+        dest = self.path(blob_id)
+        now = time.time()
+        row = db.execute("SELECT evicted_at FROM blobs WHERE blob_id = ?", (blob_id,)).fetchone()
+        if row is not None and row["evicted_at"] is None and dest.exists():
+            if not copy:
+                src.unlink(missing_ok=True)
+        else:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if copy:
+                tmp = self.temp_path(extension)
+                shutil.copyfile(src, tmp)
+                os.replace(tmp, dest)
+            else:
+                os.replace(src, dest)
+        db.execute(
+            "INSERT INTO blobs (blob_id, sha256, size, refcount, created_at, last_used) VALUES (?, ?, ?, 1, ?, ?) "
+            "ON CONFLICT (blob_id) DO UPDATE SET refcount = refcount + 1, last_used = excluded.last_used, "
+            "evicted_at = NULL",
+            (blob_id, sha256, dest.stat().st_size, now, now),
+        )
+        return dest
+
+    def release(self, sha256: str, extension: str) -> bool:
+        """Drop one reference; returns True if that removed the stored file."""
+        blob_id = self.blob_id(sha256, extension)
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT refcount FROM blobs WHERE blob_id = ?", (blob_id,)).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return False
+            if row["refcount"] > 1:
+                db.execute("UPDATE blobs SET refcount = refcount - 1 WHERE blob_id = ?", (blob_id,))
+                db.execute("COMMIT")
+                return False
+            db.execute("DELETE FROM blobs WHERE blob_id = ?", (blob_id,))
+            self.path(blob_id).unlink(missing_ok=True)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return True
+
+    def sweep(self) -> int:
+        """Enforce the age and size quotas; returns how many files were evicted."""
+        now = time.time()
+        db = self._db()
+        # Files are unlinked inside the write transaction so a concurrent put
+        # of the same content cannot have its fresh copy deleted
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute(
+                "SELECT blob_id, size, last_used FROM blobs WHERE evicted_at IS NULL ORDER BY last_used"
+            ).fetchall()
+            total = sum(row["size"] for row in rows)
+            victims = []
+            for row in rows:
+                expired = self.max_age_seconds > 0 and row["last_used"] < now - self.max_age_seconds
+                if not expired and not (self.max_bytes > 0 and total > self.max_bytes):
+                    break
+                victims.append(row["blob_id"])
+                total -= row["size"]
+            for blob_id in victims:
+                self.path(blob_id).unlink(missing_ok=True)
+            db.executemany("UPDATE blobs SET evicted_at = ? WHERE blob_id = ?", [(now, b) for b in victims])
+            db.execute("COMMIT")
+            evicted = len(victims)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        for part in self.incoming.iterdir():
+            try:
+                if now - part.stat().st_mtime > _INCOMING_TTL_SECONDS:
+                    part.unlink()
+            except FileNotFoundError:
+                pass
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        row = self._db().execute(
+            "SELECT COUNT(*) AS files, COALESCE(SUM(size), 0) AS bytes, COALESCE(SUM(refcount), 0) AS refs "
+            "FROM blobs WHERE evicted_at IS NULL"
+        ).fetchone()
+        evicted = self._db().execute("SELECT COUNT(*) FROM blobs WHERE evicted_at IS NOT NULL").fetchone()[0]
+        return {
+            "files": row["files"],
+            "bytes": row["bytes"],
+            "references": row["refs"],
+            "evicted": evicted,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds,
+        }
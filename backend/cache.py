@@ -0,0 +1,172 @@
+"""
+Two-tier (memory + disk) cache for AI results, addressed by content hash
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so re-extracted copies of a document hash identically."""
+    return _WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+def content_key(text: str, *parts: str) -> str:
+    """SHA-256 over the normalized text plus any qualifiers (model, prompt version...)."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    h.update(normalize_text(text).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """In-memory LRU in front of a sharded on-disk JSON store.
+
+    Entries expire after ``ttl_seconds`` in both tiers. The memory tier holds at
+    most ``max_entries`` items; the disk tier is pruned oldest-first once it grows
+    past ``max_disk_entries``. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path],
+        max_entries: int = 256,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_disk_entries: int = 10000,
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self._expired(stored_at):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, time.time(), value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+        self._write_disk(key, now, value)
+
+    def _remember(self, key: str, stored_at: float, value: Any) -> None:
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Any]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(float(record.get("stored_at", 0))):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return record.get("value")
+
+    def _write_disk(self, key: str, stored_at: float, value: Any) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self._writes_since_prune += 1
+            due = self._writes_since_prune >= 100
+            if due:
+                self._writes_since_prune = 0
+        if due:
+            self.prune_disk()
+
+    def prune_disk(self) -> None:
+        """Drop expired entries, then the oldest ones beyond ``max_disk_entries``."""
+        if self.directory is None:
+            return
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if self._expired(mtime):
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, path))
+        excess = len(entries) - self.max_disk_entries
+        if excess > 0:
+            entries.sort()
+            for _, path in entries[:excess]:
+                path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*/*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
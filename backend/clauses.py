@@ -0,0 +1,307 @@
+"""
+Rule-based contract segmentation and clause tagging (local pre-pass before the model call)
+"""
+import re
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+SECTION_HEADING_RE = re.compile(
+    r"^[ \t]*(?:"
+    r"(?i:section|article|clause|schedule|exhibit|annex)\s+(?:\d+|[IVXLCDM]+)\b"
+    r"|\d{1,3}(?:\.\d{1,3})*[.)]?\s+[A-Z]"
+    r"|[IVXLCDM]{1,6}[.)]\s+[A-Z]"
+    r"|[A-Z][A-Z0-9 ,&/'-]{3,60}$"
+    r")",
+    re.MULTILINE,
+)
+_SECTION_NUMBER_RE = re.compile(
+    r"[ \t]*(?:(?i:section|article|clause|schedule|exhibit|annex)\s+(\d{1,3}(?:\.\d{1,3})*|[IVXLCDM]+)\b"
+    r"|(\d{1,3}(?:\.\d{1,3})*)\b|([IVXLCDM]+)[.)])"
+)
+
+# Clause tag -> the clause type name the analysis prompt and UI use
+CLAUSE_TYPES: Dict[str, str] = {
+    "payment": "Payment Terms",
+    "termination": "Termination",
+    "liability": "Liability & Indemnity",
+    "intellectual_property": "Intellectual Property",
+    "confidentiality": "Confidentiality",
+    "dispute_resolution": "Dispute Resolution",
+    "force_majeure": "Force Majeure",
+}
+_CLAUSE_IMPORTANCE = {
+    "payment": "high",
+    "termination": "high",
+    "liability": "high",
+    "intellectual_property": "medium",
+    "confidentiality": "medium",
+    "dispute_resolution": "medium",
+    "force_majeure": "low",
+}
+# Keywords per tag: plain words match exactly, "stem*" matches any word starting
+# with the stem, and two-word phrases match consecutive words
+_CLAUSE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "payment": (
+        "pay", "pays", "paid", "payment", "payments", "payable", "invoic*", "fee", "fees", "price", "prices",
+        "pricing", "compensation", "remuneration", "reimburs*",
+    ),
+    "termination": ("terminat*", "expir*", "renew*", "cancel*", "notice period"),
+    "liability": (
+        "liabilit*", "liable", "indemni*", "hold harmless", "damages", "warranty", "warranties", "consequential",
+    ),
+    "intellectual_property": (
+        "intellectual property", "patent", "patents", "copyright*", "trademark*", "trade secret", "trade secrets",
+        "licens*", "licenc*", "work product", "ownership",
+    ),
+    "confidentiality": ("confidential*", "nondisclosure", "non-disclosure", "proprietary information", "secrecy"),
+    "dispute_resolution": (
+        "arbitrat*", "governing law", "jurisdiction*", "dispute", "disputes", "mediat*", "litigation", "venue",
+    ),
+    "force_majeure": (
+        "force majeure", "of god", "reasonable control", "epidemic*", "pandemic*", "natural disaster",
+        "natural disasters",
+    ),
+}
+# Keyword hits needed to tag a section; a hit in the heading counts this many times
+TAG_MIN_SCORE = 2
+_HEADING_WEIGHT = 3
+
+# (risk type, description, severity, pattern) for the degraded local analysis
+_RISK_RULES: Tuple[Tuple[str, str, str, str], ...] = (
+    ("Liability Risk", "Unlimited or uncapped liability", "high", r"unlimited\s+liabilit\w*|uncapped"),
+    ("Indemnity Risk", "Broad indemnification obligation", "high",
+     r"indemnify,?\s+(?:and\s+)?(?:defend|hold\s+harmless)|defend,?\s+indemnify|hold\s+harmless"),
+    ("Renewal Risk", "Automatic renewal", "medium", r"automatic(?:ally)?\s+renew\w*|auto-renew\w*"),
+    ("Financial Risk", "Late payment fees or interest", "medium",
+     r"late\s+(?:fee|charge|payment)s?|interest\s+(?:at|of)\s+\d"),
+    ("Termination Risk", "Termination for convenience", "medium",
+     r"terminat\w*\s+(?:this\s+agreement\s+)?for\s+convenience|terminate\s+at\s+any\s+time"),
+    ("Restrictive Covenant", "Non-compete or exclusivity obligation", "medium", r"non-?compet\w*|exclusiv\w*"),
+    ("Financial Risk", "Liquidated damages or penalties", "medium", r"liquidated\s+damages|penalt(?:y|ies)"),
+    ("Legal Risk", "Unilateral right to amend the agreement", "medium",
+     r"(?:may|reserves\s+the\s+right\s+to)\s+(?:amend|modify|change)\s+(?:this|these|the\s+terms)"),
+)
+_RISK_RE = re.compile(
+    "|".join(rf"(?P<r{i}>\b(?:{rule[3]}))" for i, rule in enumerate(_RISK_RULES)), re.IGNORECASE
+)
+# A section is only searched with _RISK_RE if it contains one of these words
+_RISK_TRIGGERS = frozenset((
+    "unlimited", "uncapped", "harmless", "defend", "automatic", "automatically", "auto-renew", "auto-renewal",
+    "late", "interest", "convenience", "time", "non-compete", "noncompete", "exclusive", "exclusivity",
+    "exclusively", "liquidated", "penalty", "penalties", "amend", "modify", "change",
+))
+_SEVERITY_POINTS = {"high": 15, "medium": 8, "low": 3}
+_EXCERPT_CHARS = 300
+_BLANK_LINES_RE = re.compile(r"\n[ \t]*\n(?:[ \t]*\n)+")
+_SPACES_RE = re.compile(r"[ \t]{2,}")
+_WORD_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+
+def _build_index(keywords: Dict[str, Tuple[str, ...]]):
+    exact: Dict[str, str] = {}
+    stems: Dict[str, str] = {}
+    phrases: Dict[Tuple[str, str], str] = {}
+    for tag, words in keywords.items():
+        for word in words:
+            if " " in word:
+                first, second = word.split()
+                phrases[(first, second)] = tag
+            elif word.endswith("*"):
+                stems[word[:-1]] = tag
+            else:
+                exact[word] = tag
+    return exact, stems, sorted({len(stem) for stem in stems}), phrases
+
+
+_EXACT_TAGS, _STEM_TAGS, _STEM_LENGTHS, _PHRASE_TAGS = _build_index(_CLAUSE_KEYWORDS)
+# word -> tag (or "") for words already looked up; vocabularies are small, so this stays bounded
+_word_tags: Dict[str, str] = {}
+_WORD_CACHE_LIMIT = 200000
+
+
+def _word_tag(word: str) -> str:
+    tag = _word_tags.get(word)
+    if tag is None:
+        tag = _EXACT_TAGS.get(word, "")
+        if not tag:
+            for length in _STEM_LENGTHS:
+                if len(word) < length:
+                    break
+                tag = _STEM_TAGS.get(word[:length], "")
+                if tag:
+                    break
+        if len(_word_tags) >= _WORD_CACHE_LIMIT:
+            _word_tags.clear()
+        _word_tags[word] = tag
+    return tag
+
+
+def _scan_words(words: List[str], weight: int, scores: Counter) -> None:
+    previous = ""
+    for word in words:
+        tag = _word_tags.get(word)
+        if tag is None:
+            tag = _word_tag(word)
+        if tag:
+            scores[tag] += weight
+        elif previous:
+            tag = _PHRASE_TAGS.get((previous, word))
+            if tag:
+                scores[tag] += weight
+        previous = word
+
+
+class Section(NamedTuple):
+    index: int
+    number: Optional[str]
+    heading: str
+    start: int
+    end: int
+    text: str
+    tags: Tuple[str, ...] = ()
+
+    @property
+    def label(self) -> str:
+        return f"Section {self.number}" if self.number else f"Part {self.index + 1}"
+
+
+def _section_starts(text: str) -> List[int]:
+    starts = [m.start() for m in SECTION_HEADING_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return starts
+
+
+def segment(text: str) -> List[Section]:
+    """Split contract text at section headings ("1.", "Section 4", "ARTICLE IV", ALL-CAPS titles)."""
+    bounds = _section_starts(text) + [len(text)]
+    sections: List[Section] = []
+    for start, end in zip(bounds, bounds[1:]):
+        body = text[start:end]
+        if not body.strip():
+            continue
+        heading = body.lstrip().split("\n", 1)[0].strip()[:120]
+        match = _SECTION_NUMBER_RE.match(body)
+        number = next((g for g in match.groups() if g), None) if match else None
+        sections.append(Section(len(sections), number, heading, start, end, body))
+    return sections
+
+
+def tag_sections(sections: List[Section]) -> List[Section]:
+    """Attach likely clause tags to each section using the compiled keyword index."""
+    tagged = []
+    for section in sections:
+        scores: Counter = Counter()
+        _scan_words(_WORD_RE.findall(section.heading.lower()), _HEADING_WEIGHT - 1, scores)
+        _scan_words(_WORD_RE.findall(section.text.lower()), 1, scores)
+        tags = tuple(tag for tag in CLAUSE_TYPES if scores[tag] >= TAG_MIN_SCORE)
+        tagged.append(section._replace(tags=tags) if tags else section)
+    return tagged
+
+
+def classify(text: str) -> List[Section]:
+    """Segment and tag in one call."""
+    return tag_sections(segment(text))
+
+
+def _compact(text: str) -> str:
+    return _SPACES_RE.sub(" ", _BLANK_LINES_RE.sub("\n\n", text)).strip()
+
+
+def section_map(sections: Sequence[Section]) -> Dict[str, List[str]]:
+    """Clause tag -> labels of the sections tagged with it, in document order."""
+    found: Dict[str, List[str]] = {}
+    for section in sections:
+        for tag in section.tags:
+            found.setdefault(tag, []).append(section.label)
+    return found
+
+
+def section_header(section: Section) -> str:
+    kinds = ", ".join(CLAUSE_TYPES[t] for t in section.tags)
+    return f"[{section.label}{' | ' + kinds if kinds else ''}]"
+
+
+def labelled_text(sections: Sequence[Section], limit: Optional[int] = None) -> str:
+    """Sections as ``[Section 4.2 | Payment Terms]`` blocks with whitespace collapsed.
+
+    Every section keeps its body; with ``limit`` the result is cut at that many
+    characters, so callers that can chunk should size their input to fit.
+    """
+    text = "\n\n".join(f"{section_header(section)}\n{_compact(section.text)}" for section in sections)
+    return text[:limit] if limit else text
+
+
+def local_analysis(text: str, reason: Optional[str] = None) -> Dict[str, Any]:
+    """Degraded analysis from rules alone, in the same shape the model returns.
+
+    Used when Gemini is unavailable or its output cannot be parsed. Carries
+    ``"degraded": True`` so clients (and the cache) can tell it apart.
+    """
+    sections = classify(text)
+
+    key_clauses = []
+    first_tagged: Dict[str, Section] = {}
+    for section in sections:
+        for tag in section.tags:
+            first_tagged.setdefault(tag, section)
+    for tag, labels in section_map(sections).items():
+        excerpt = _compact(first_tagged[tag].text)
+        key_clauses.append({
+            "type": CLAUSE_TYPES[tag],
+            "content": excerpt[:_EXCERPT_CHARS] + ("..." if len(excerpt) > _EXCERPT_CHARS else ""),
+            "importance": _CLAUSE_IMPORTANCE[tag],
+            "clause_reference": ", ".join(dict.fromkeys(labels[:5])),
+        })
+
+    # One risk per rule, citing the (first few) sections where it matched
+    hits: Dict[int, List[Tuple[Section, str]]] = {}
+    for section in sections:
+        if _RISK_TRIGGERS.isdisjoint(_WORD_RE.findall(section.text.lower())):
+            continue
+        for match in _RISK_RE.finditer(section.text):
+            rule = int(match.lastgroup[1:])
+            found = hits.setdefault(rule, [])
+            if not found or found[-1][0].index != section.index:
+                found.append((section, match.group(0).strip()))
+    risks = []
+    for rule in sorted(hits):
+        risk_type, description, severity, _ = _RISK_RULES[rule]
+        found = hits[rule]
+        where = f" ({len(found)} places)" if len(found) > 1 else ""
+        risks.append({
+            "risk_type": risk_type,
+            "description": f"{description}{where}, e.g. \"{found[0][1]}\"",
+            "severity": severity,
+            "clause_reference": ", ".join(dict.fromkeys(s.label for s, _ in found[:5])),
+        })
+    tags = {tag for s in sections for tag in s.tags}
+    if "liability" not in tags:
+        risks.append({
+            "risk_type": "Liability Risk",
+            "description": "No limitation of liability or indemnity clause was found",
+            "severity": "medium",
+            "clause_reference": "N/A",
+        })
+    if "termination" not in tags:
+        risks.append({
+            "risk_type": "Termination Risk",
+            "description": "No termination clause was found",
+            "severity": "low",
+            "clause_reference": "N/A",
+        })
+
+    score = 20 + sum(_SEVERITY_POINTS[r["severity"]] for r in risks)
+    found = ", ".join(CLAUSE_TYPES[t] for t in CLAUSE_TYPES if t in tags) or "none of the standard clause types"
+    summary = [
+        "- Preliminary rule-based review; AI analysis was unavailable" + (f" ({reason})" if reason else ""),
+        f"- {len(sections)} sections detected; clauses found: {found}",
+        f"- {len(risks)} potential risk(s) flagged by keyword rules",
+    ]
+    return {
+        "summary": "\n".join(summary),
+        "key_clauses": key_clauses,
+        "risks": risks,
+        "risk_score": max(0, min(95, score)),
+        "degraded": True,
+    }
@@ -0,0 +1,135 @@
+"""
+Executors that keep blocking work (text extraction, Gemini calls) off the event loop
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Optional
+
+from backend.extract import TextPrefix, extract_text_from_file, extract_text_prefix
+
+_extract_executor: Optional[Executor] = None
+_model_executor: Optional[ThreadPoolExecutor] = None
+_model_slots: Optional[asyncio.Semaphore] = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, "") or default))
+    except ValueError:
+        return default
+
+
+def get_extract_executor() -> Executor:
+    """Pool for CPU-bound PDF/DOCX parsing.
+
+    EXTRACT_EXECUTOR selects ``process`` (default) or ``thread``; EXTRACT_WORKERS
+    sets the pool size (defaults to the CPU count). Falls back to threads where
+    the platform cannot start worker processes.
+    """
+    global _extract_executor
+    if _extract_executor is None:
+        workers = _env_int("EXTRACT_WORKERS", os.cpu_count() or 1)
+        if os.getenv("EXTRACT_EXECUTOR", "process").lower() == "process":
+            try:
+                _extract_executor = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, NotImplementedError, ImportError):
+                _extract_executor = None
+        if _extract_executor is None:
+            _extract_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract")
+    return _extract_executor
+
+
+def get_model_executor() -> ThreadPoolExecutor:
+    """Thread pool that runs the blocking Gemini client, sized by GEMINI_MAX_CONCURRENCY."""
+    global _model_executor
+    if _model_executor is None:
+        _model_executor = ThreadPoolExecutor(
+            max_workers=_env_int("GEMINI_MAX_CONCURRENCY", 32),
+            thread_name_prefix="gemini",
+        )
+    return _model_executor
+
+
+def _get_model_slots() -> asyncio.Semaphore:
+    global _model_slots
+    if _model_slots is None:
+        _model_slots = asyncio.Semaphore(_env_int("GEMINI_MAX_CONCURRENCY", 32))
+    return _model_slots
+
+
+async def run_extraction(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a text-extraction callable in the extraction pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_extract_executor(), functools.partial(func, *args))
+
+
+async def extract_text_in_pool(file_path: Path) -> str:
+    """Extract a contract file's text using the extraction pool.
+
+    With a process pool, PDFs are coordinated from a thread and their page
+    ranges fan out across the worker processes; other formats run whole in
+    a single pool worker.
+    """
+    pool = get_extract_executor()
+    if file_path.suffix.lower() == ".pdf" and isinstance(pool, ProcessPoolExecutor):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, extract_text_from_file, file_path, pool)
+    return await run_extraction(extract_text_from_file, file_path)
+
+
+async def extract_prefix_in_pool(file_path: Path, max_chars: int) -> TextPrefix:
+    """``extract_text_prefix`` in the extraction pool: (text, whether it is the whole document, PDF pages)."""
+    return await run_extraction(extract_text_prefix, file_path, max_chars)
+
+
+async def run_model_call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking model call on the Gemini pool, capping calls in flight.
+
+    Waiting happens on an asyncio semaphore rather than in the executor queue,
+    so requests whose clients have gone away can be cancelled before they
+    spend a Gemini call.
+    """
+    loop = asyncio.get_running_loop()
+    async with _get_model_slots():
+        return await loop.run_in_executor(get_model_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def stream_model_call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+    """Iterate a blocking generator (a streaming Gemini call) on the Gemini pool.
+
+    Holds one model slot for the lifetime of the stream and closes the
+    generator if the consumer goes away early.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_model_executor()
+    done = object()
+    async with _get_model_slots():
+        iterator = await loop.run_in_executor(executor, lambda: iter(func(*args, **kwargs)))
+        try:
+            while True:
+                item = await loop.run_in_executor(executor, next, iterator, done)
+                if item is done:
+                    break
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                try:
+                    await loop.run_in_executor(executor, close)
+                except ValueError:
+                    # Still running in the pool after a cancellation; it will finish on its own
+                    pass
+
+
+def shutdown_executors() -> None:
+    global _extract_executor, _model_executor, _model_slots
+    if _extract_executor is not None:
+        _extract_executor.shutdown(wait=False, cancel_futures=True)
+        _extract_executor = None
+    if _model_executor is not None:
+        _model_executor.shutdown(wait=False, cancel_futures=True)
+        _model_executor = None
+    _model_slots = None
@@ -1,38 +1,241 @@
 """
 Contract AI analysis functions using Google Gemini
 """
+import copy
+import hashlib
 import json
 import re
-from typing import Dict, List, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, Optional, Tuple
 import os
-import google.generativeai as genai
+from backend.cache import ResultCache, content_key, normalize_text
+from backend.clauses import CLAUSE_TYPES, classify, labelled_text, local_analysis, section_header, section_map
+from backend import metrics
+from backend.jsonstream import IncrementalObjectParser
+from backend.limits import AdaptiveLimiter, SingleFlight, backoff_delay, is_overload_error
+from backend.retrieval import retrieve_passages, retrieve_passages_for
+from backend.similarity import Fingerprint, fingerprint, get_similarity_index
 
-def _get_model() -> genai.GenerativeModel:
+if TYPE_CHECKING:
+    # Imported lazily in _get_model: the SDK takes about a second to import,
+    # which cold starts serving /health or /credits should not pay
+    import google.generativeai as genai
+
+# Bump whenever the analysis prompt or its post-processing changes so that
+# cached results produced by the old prompt are no longer served.
+ANALYSIS_PROMPT_VERSION = "4"
+
+# Same for the question prompts and cached answers
+QUESTION_PROMPT_VERSION = "1"
+# Most questions answered by one /ask-questions model call, and the excerpts it may send
+QUESTION_BATCH_MAX = int(os.getenv("QUESTION_BATCH_MAX", "20"))
+QUESTION_BATCH_MAX_PASSAGES = int(os.getenv("QUESTION_BATCH_MAX_PASSAGES", "16"))
+
+# Characters of contract text sent per analysis prompt; longer contracts are
+# analyzed in section-aligned chunks of this size
+ANALYSIS_WINDOW_CHARS = int(os.getenv("ANALYSIS_WINDOW_CHARS", "12000"))
+ANALYSIS_MAX_PARALLEL_CHUNKS = max(1, int(os.getenv("ANALYSIS_MAX_PARALLEL_CHUNKS", "8")))
+MERGED_SUMMARY_BULLETS = 6
+
+# Near-duplicates (see backend/similarity.py) are re-analyzed only in the sections
+# that changed, unless more than this share of the text changed
+SIMILARITY_MAX_CHANGED = float(os.getenv("SIMILARITY_MAX_CHANGED", "0.5"))
+
+# Process-wide adaptive cap on concurrent generate_content calls (chunked analysis
+# fans out from inside a single request, so the per-request limit is not enough).
+# It shrinks on upstream 429/5xx, and those errors are retried with jittered backoff.
+model_limiter = AdaptiveLimiter(
+    max_limit=int(os.getenv("GEMINI_MAX_CONCURRENCY", "32")),
+    min_limit=int(os.getenv("GEMINI_MIN_CONCURRENCY", "2")),
+)
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+
+# Identical prompts in flight at the same time share one upstream call
+model_calls = SingleFlight()
+
+_analysis_cache: Optional[ResultCache] = None
+_answer_cache: Optional[ResultCache] = None
+
+# Long-lived client, rebuilt only when GEMINI_API_KEY or GEMINI_MODEL change
+_model: Optional["genai.GenerativeModel"] = None
+_model_config: Optional[Tuple[str, str]] = None
+_model_lock = threading.Lock()
+
+def _model_name() -> str:
+    return os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+def _get_model() -> "genai.GenerativeModel":
+    global _model, _model_config
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY is not set")
-    genai.configure(api_key=api_key)
-    model_name = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
-    return genai.GenerativeModel(model_name)
+    config = (api_key, _model_name())
+    model = _model
+    if model is not None and _model_config == config:
+        return model
+    with _model_lock:
+        if _model is None or _model_config != config:
+            import google.generativeai as genai
+
+            # configure() replaces the shared transport, so only call it on changes
+            genai.configure(api_key=api_key)
+            _model = genai.GenerativeModel(config[1])
+            _model_config = config
+        return _model
+
+def warm_up_model() -> bool:
+    """Build the shared client and open its connection before the first request.
+
+    Uses count_tokens, which needs a round-trip (DNS, TLS, auth) but no
+    generation. Returns False instead of raising when Gemini is unavailable.
+    """
+    try:
+        _get_model().count_tokens("ping")
+        return True
+    except Exception as e:
+        print(f"[Gemini] Warm-up skipped: {e}")
+        return False
 
-def _extract_json(text: str) -> Dict[str, Any]:
+def _result_cache(name: str, max_entries: int) -> ResultCache:
+    data_dir = Path(os.getenv("APP_DATA_DIR", "/tmp")).resolve() / "data"
+    enabled = os.getenv("ANALYSIS_CACHE_DISK", "true").lower() not in {"0", "false", "no"}
+    return ResultCache(
+        data_dir / name if enabled else None,
+        max_entries=max_entries,
+        ttl_seconds=float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        max_disk_entries=int(os.getenv("ANALYSIS_CACHE_MAX_DISK_ENTRIES", "10000")),
+    )
+
+def get_analysis_cache() -> ResultCache:
+    """Process-wide analysis cache, persisted under APP_DATA_DIR/data/analysis_cache."""
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = _result_cache("analysis_cache", int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "256")))
+    return _analysis_cache
+
+def get_answer_cache() -> ResultCache:
+    """Process-wide cache of question answers per contract, under APP_DATA_DIR/data/answer_cache."""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = _result_cache("answer_cache", int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2048")))
+    return _answer_cache
+
+def _extract_json(text: str, operation: str) -> Dict[str, Any]:
     # Try to extract JSON block if wrapped in triple backticks
     match = re.search(r"```json\s*(.*?)\s*```", text, re.DOTALL)
     if match:
         text = match.group(1)
-    return json.loads(text)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        metrics.JSON_PARSE_FAILURES.inc(operation=operation)
+        raise
 
-def analyze_contract_with_ai(contract_text: str) -> Dict[str, Any]:
-    """Analyze contract using Gemini and return structured analysis."""
-    model = _get_model()
-    prompt = f"""
+def _response_text(resp) -> str:
+    try:
+        return resp.text or ""
+    except ValueError:
+        # Blocked or empty candidates have no text parts
+        return ""
+
+def model_call_stats() -> Dict[str, Any]:
+    """Limiter and coalescing counters for /health."""
+    return {**model_limiter.stats(), "coalesced": model_calls.coalesced}
+
+def _generate(model: "genai.GenerativeModel", prompt: str, operation: str):
+    """Single choke point for Gemini calls.
+
+    Concurrent calls with the same model and prompt are coalesced into one
+    upstream request; each upstream request runs under the adaptive limiter
+    and is timed under ``operation`` in the model-call metrics.
+    """
+    def call():
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            resp = model_limiter.call(lambda: model.generate_content(prompt), retries=GEMINI_MAX_RETRIES)
+            outcome = "ok"
+        finally:
+            metrics.MODEL_CALL_SECONDS.observe(time.perf_counter() - started, operation=operation, outcome=outcome)
+        metrics.MODEL_PROMPT_CHARS.observe(len(prompt), operation=operation)
+        metrics.MODEL_RESPONSE_CHARS.observe(len(_response_text(resp)), operation=operation)
+        return resp
+
+    key = hashlib.sha256(f"{model.model_name}\0{prompt}".encode("utf-8")).hexdigest()
+    return model_calls.do(key, call)
+
+def _generate_stream(model: "genai.GenerativeModel", prompt: str, operation: str) -> Iterator[str]:
+    """Streaming counterpart of ``_generate``; yields text deltas as they arrive.
+
+    Overload errors are retried only before the first delta has been yielded.
+    """
+    call_started = time.perf_counter()
+    chars = 0
+    outcome = "error"
+    metrics.MODEL_PROMPT_CHARS.observe(len(prompt), operation=operation)
+    try:
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            model_limiter.acquire()
+            started = overloaded = succeeded = False
+            try:
+                for chunk in model.generate_content(prompt, stream=True):
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Chunks without text parts (e.g. safety metadata only)
+                        continue
+                    if text:
+                        if not started:
+                            metrics.MODEL_FIRST_DELTA_SECONDS.observe(
+                                time.perf_counter() - call_started, operation=operation
+                            )
+                        started = True
+                        chars += len(text)
+                        yield text
+                succeeded = True
+                outcome = "ok"
+                return
+            except Exception as e:
+                overloaded = is_overload_error(e)
+                if started or not overloaded or attempt == GEMINI_MAX_RETRIES:
+                    raise
+            finally:
+                model_limiter.release(overloaded=overloaded, succeeded=succeeded)
+            time.sleep(backoff_delay(attempt))
+    finally:
+        metrics.MODEL_CALL_SECONDS.observe(time.perf_counter() - call_started, operation=operation, outcome=outcome)
+        metrics.MODEL_RESPONSE_CHARS.observe(chars, operation=operation)
+
+def _analysis_prompt(contract_text: str, part: Optional[Tuple[int, int]] = None, changed_only: bool = False) -> str:
+    scope = ""
+    if changed_only:
+        scope = (
+            "These are only the sections that differ from a previously analyzed version of the same "
+            "contract. Analyze only these sections; the rest has been analyzed already.\n"
+        )
+    elif part is not None:
+        scope = (
+            f"This is part {part[0]} of {part[1]} of a longer contract. Analyze only this part; "
+            "other parts are analyzed separately.\n"
+        )
+    sections = classify(contract_text)
+    found = section_map(sections)
+    hints = "\n".join(f"- {CLAUSE_TYPES[tag]}: {', '.join(labels[:8])}" for tag, labels in found.items())
+    return f"""
 You are a legal AI assistant specializing in contract analysis.
 Always return STRICT valid JSON with the exact schema below.
 
 Analyze the following contract and provide a comprehensive analysis in JSON format.
+{scope}
+The contract is split into labelled sections. A keyword pre-pass suggests where these clauses are
+(it may be incomplete or wrong; verify against the text):
+{hints or "- no standard clauses detected"}
 
-Contract Text:
-{contract_text[:12000]}
+Contract Sections:
+{labelled_text(sections, ANALYSIS_WINDOW_CHARS)}
 
 Return exactly this JSON structure:
 {{
@@ -41,7 +244,8 @@ Return exactly this JSON structure:
     {{
       "type": "Payment Terms",
       "content": "extracted clause text",
-      "importance": "high|medium|low"
+      "importance": "high|medium|low",
+      "clause_reference": "relevant clause"
     }}
   ],
   "risks": [
@@ -58,77 +262,532 @@ Return exactly this JSON structure:
 Notes:
 - Focus on payment terms, deadlines, termination, liability/indemnity, IP, confidentiality, dispute resolution, force majeure.
 - risk_score is 0–100 (0 very safe, 100 very risky).
+- Use the section labels (e.g. "Section 4.2") as clause_reference for clauses and risks.
 """
+
+def _parse_error_analysis(contract_text: str) -> Dict[str, Any]:
+    return local_analysis(contract_text, "the AI response could not be parsed")
+
+# Room left in each chunk for labels that differ once the chunk is re-segmented
+# on its own (a section continued from the previous chunk becomes "Part 1")
+_CHUNK_LABEL_SLACK = 64
+
+def needs_chunking(contract_text: str) -> bool:
+    """True when the labelled sections of ``contract_text`` do not fit one prompt window."""
+    if len(contract_text) > ANALYSIS_WINDOW_CHARS:
+        return True
+    return len(labelled_text(classify(contract_text))) > ANALYSIS_WINDOW_CHARS
+
+def chunk_contract(contract_text: str, limit: int = None) -> List[str]:
+    """Pack whole sections into chunks whose labelled prompt text fits ``limit`` characters.
+
+    Each section is costed with its ``[Section N | ...]`` label, so the prompt
+    never has to cut section bodies. Sections longer than the limit are split
+    on paragraph breaks, and as a last resort hard-cut, so no text is dropped.
+    """
+    limit = (limit or ANALYSIS_WINDOW_CHARS) - _CHUNK_LABEL_SLACK
+    pieces: List[Tuple[str, int]] = []  # (text, label overhead)
+    for section in classify(contract_text):
+        overhead = len(section_header(section)) + 3  # label line break and block separator
+        body_limit = max(1, limit - overhead)
+        if len(section.text) <= body_limit:
+            pieces.append((section.text, overhead))
+            continue
+        for para in re.split(r"(?<=\n\n)", section.text):
+            pieces.extend((para[i:i + body_limit], overhead) for i in range(0, len(para), body_limit))
+    chunks: List[str] = []
+    current = ""
+    size = 0
+    for piece, overhead in pieces:
+        if current and size + len(piece) + overhead > limit:
+            chunks.append(current)
+            current = ""
+            size = 0
+        current += piece
+        size += len(piece) + overhead
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+def _summary_bullets(summary: str) -> List[str]:
+    lines = [line.strip() for line in (summary or "").splitlines() if line.strip()]
+    return [line if line.startswith(("-", "•")) else f"- {line}" for line in lines]
+
+def _item_key(field: str, item: Dict[str, Any]) -> Tuple[str, str]:
+    """Identity of a clause or risk for de-duplication across chunks."""
+    kind, text = ("type", "content") if field == "key_clauses" else ("risk_type", "description")
+    return str(item.get(kind, "")).lower(), normalize_text(str(item.get(text, "")))[:200].lower()
+
+def merge_analyses(parts: List[Dict[str, Any]], weights: List[int]) -> Dict[str, Any]:
+    """Combine per-chunk analyses into a single ContractAnalysis-shaped dict.
+
+    Clauses and risks are concatenated in document order with duplicates removed.
+    The risk score blends the length-weighted mean with the riskiest chunk, so a
+    single dangerous section is not averaged away.
+    """
+    bullets: List[str] = []
+    key_clauses: List[Dict[str, Any]] = []
+    risks: List[Dict[str, Any]] = []
+    seen_bullets, seen_clauses, seen_risks = set(), set(), set()
+    for part in parts:
+        for bullet in _summary_bullets(part.get("summary", "")):
+            k = bullet.lower()
+            if k not in seen_bullets:
+                seen_bullets.add(k)
+                bullets.append(bullet)
+        for clause in part.get("key_clauses") or []:
+            k = _item_key("key_clauses", clause)
+            if k not in seen_clauses:
+                seen_clauses.add(k)
+                key_clauses.append(clause)
+        for risk in part.get("risks") or []:
+            k = _item_key("risks", risk)
+            if k not in seen_risks:
+                seen_risks.add(k)
+                risks.append(risk)
+
+    scores = []
+    for part, weight in zip(parts, weights):
+        try:
+            scores.append((float(part.get("risk_score", 50)), weight))
+        except (TypeError, ValueError):
+            continue
+    if scores:
+        total = sum(w for _, w in scores) or 1
+        weighted = sum(score * w for score, w in scores) / total
+        peak = max(score for score, _ in scores)
+        risk_score = int(round((weighted + peak) / 2))
+    else:
+        risk_score = 50
+    return {
+        "summary": "\n".join(bullets[:MERGED_SUMMARY_BULLETS]),
+        "key_clauses": key_clauses,
+        "risks": risks,
+        "risk_score": max(0, min(100, risk_score)),
+    }
+
+def _iter_chunk_analyses(model: "genai.GenerativeModel", chunks: List[str]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """Analyze chunks concurrently, yielding (index, analysis or None) as each finishes."""
+    def run(index: int) -> Optional[Dict[str, Any]]:
+        resp = _generate(model, _analysis_prompt(chunks[index], (index + 1, len(chunks))), "analyze_chunk")
+        try:
+            return _extract_json(_response_text(resp) or "{}", "analyze_chunk")
+        except json.JSONDecodeError:
+            return None
+
+    pool = ThreadPoolExecutor(max_workers=min(len(chunks), ANALYSIS_MAX_PARALLEL_CHUNKS))
     try:
-        resp = model.generate_content(prompt)
-        content = resp.text or "{}"
-        return _extract_json(content)
+        futures = {pool.submit(run, i): i for i in range(len(chunks))}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _merge_chunk_results(chunks: List[str], results: Dict[int, Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    parsed = [(results[i], len(chunks[i])) for i in sorted(results) if results[i] is not None]
+    if not parsed:
+        raise json.JSONDecodeError("No chunk returned valid JSON", "", 0)
+    return merge_analyses([r for r, _ in parsed], [w for _, w in parsed])
+
+def _analyze_chunked(model: "genai.GenerativeModel", chunks: List[str]) -> Dict[str, Any]:
+    return _merge_chunk_results(chunks, dict(_iter_chunk_analyses(model, chunks)))
+
+def _analyze_text(model: "genai.GenerativeModel", contract_text: str, changed_only: bool = False) -> Dict[str, Any]:
+    if needs_chunking(contract_text):
+        return _analyze_chunked(model, chunk_contract(contract_text))
+    resp = _generate(model, _analysis_prompt(contract_text, changed_only=changed_only), "analyze")
+    return _extract_json(_response_text(resp) or "{}", "analyze")
+
+def _references(reference: str, labels: List[str]) -> bool:
+    return any(re.search(rf"\b{re.escape(label)}\b(?!\.\d)", reference, re.IGNORECASE) for label in labels)
+
+def _clause_bullet(clause: Dict[str, Any]) -> str:
+    content = normalize_text(str(clause.get("content", "")))
+    if len(content) > 160:
+        content = content[:157].rstrip() + "..."
+    return f"- {clause.get('type', 'Clause')}: {content}"
+
+def _rebase_analysis(prior: Dict[str, Any], stale_labels: List[str], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop what ``delta`` supersedes from a prior analysis.
+
+    Clauses and risks citing a section that changed or disappeared are removed.
+    A clause without a reference is removed when the re-analyzed sections report
+    its type again. The prior summary describes the other contract (its
+    parties, dates and amounts), so it is replaced by one bullet per kept clause.
+    """
+    redone = {str(c.get("type", "")).lower() for c in delta.get("key_clauses") or []}
+
+    def current(clause: Dict[str, Any]) -> bool:
+        reference = str(clause.get("clause_reference") or "")
+        if reference and reference != "N/A":
+            return not _references(reference, stale_labels)
+        return str(clause.get("type", "")).lower() not in redone
+
+    key_clauses = [c for c in prior.get("key_clauses") or [] if current(c)]
+    return {
+        **prior,
+        "summary": "\n".join(_clause_bullet(c) for c in key_clauses),
+        "key_clauses": key_clauses,
+        "risks": [
+            r for r in prior.get("risks") or []
+            if not _references(str(r.get("clause_reference", "")), stale_labels)
+        ],
+    }
+
+def _analyze_near_duplicate(model: "genai.GenerativeModel", fp: Fingerprint, scope: str) -> Optional[Dict[str, Any]]:
+    """Reuse the analysis of a near-identical contract, re-analyzing only the sections that differ.
+
+    Returns None when nothing similar is indexed or too much of the text changed.
+    """
+    match = get_similarity_index().nearest(scope, fp.signature)
+    if match is None:
+        metrics.SIMILARITY_LOOKUPS.inc(result="miss")
+        return None
+    known = {h for h, _ in match.sections}
+    changed = [s for s, h in zip(fp.sections, fp.hashes) if h not in known]
+    total = sum(len(s.text) for s in fp.sections) or 1
+    changed_chars = sum(len(s.text) for s in changed)
+    if changed_chars > total * SIMILARITY_MAX_CHANGED:
+        metrics.SIMILARITY_LOOKUPS.inc(result="too_different")
+        return None
+
+    current = set(fp.hashes)
+    stale_labels = sorted({label for h, label in match.sections if h not in current})
+    if changed:
+        delta = _analyze_text(model, "\n\n".join(s.text for s in changed), changed_only=True)
+        # The delta goes first so its summary bullets survive the bullet cap
+        # ahead of the kept clauses
+        analysis = merge_analyses(
+            [delta, _rebase_analysis(match.analysis, stale_labels, delta)], [changed_chars, total - changed_chars]
+        )
+    else:
+        analysis = _rebase_analysis(match.analysis, stale_labels, {})
+    analysis["similar_to"] = {
+        "similarity": round(match.similarity, 3),
+        "reanalyzed_sections": len(changed),
+        "total_sections": len(fp.sections),
+    }
+    metrics.SIMILARITY_LOOKUPS.inc(result="reused")
+    metrics.SIMILARITY_REANALYZED_FRACTION.observe(changed_chars / total)
+    return analysis
+
+def _index_analysis(cache_key: str, scope: str, fp: Fingerprint, analysis: Dict[str, Any]) -> None:
+    # Only full analyses are indexed, so reuse never builds on a reuse
+    try:
+        get_similarity_index().add(cache_key, scope, fp, analysis)
+    except Exception as e:
+        print(f"[Similarity] Could not index analysis: {e}")
+
+def forget_contract_analysis(contract_text: str) -> bool:
+    """Remove a contract from the near-duplicate index so its analysis is no longer reused."""
+    index = get_similarity_index()
+    if index is None:
+        return False
+    return index.remove(content_key(contract_text, _model_name(), ANALYSIS_PROMPT_VERSION))
+
+def analyze_contract_with_ai(contract_text: str) -> Dict[str, Any]:
+    """Analyze contract using Gemini and return structured analysis.
+
+    Results are cached by normalized text, model name and prompt version, so a
+    repeated contract is answered from the cache without calling Gemini.
+    A near-duplicate of an indexed contract (same template, different parties
+    or dates) has only its changed sections analyzed, merged into the stored
+    analysis. Contracts longer than the prompt window are split on section
+    boundaries, analyzed chunk by chunk in parallel and merged.
+    """
+    cache = get_analysis_cache()
+    scope = f"{_model_name()}:{ANALYSIS_PROMPT_VERSION}"
+    cache_key = content_key(contract_text, _model_name(), ANALYSIS_PROMPT_VERSION)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    model = _get_model()
+    fp = fingerprint(contract_text) if get_similarity_index() is not None else None
+    analysis = None
+    try:
+        if fp is not None:
+            analysis = _analyze_near_duplicate(model, fp, scope)
+        if analysis is None:
+            analysis = _analyze_text(model, contract_text)
+            if fp is not None:
+                _index_analysis(cache_key, scope, fp, analysis)
     except json.JSONDecodeError:
-        return {
-            "summary": "Contract analysis completed, but formatting error occurred.",
-            "key_clauses": [],
-            "risks": [{
-                "risk_type": "Analysis Error",
-                "description": "Could not parse AI response",
-                "severity": "low",
-                "clause_reference": "N/A"
-            }],
-            "risk_score": 50,
-        }
+        return _parse_error_analysis(contract_text)
     except Exception as e:
         raise Exception(f"AI analysis failed: {str(e)}")
+    cache.set(cache_key, analysis)
+    return copy.deepcopy(analysis)
+
+_STREAMED_FIELDS = ("summary", "key_clauses", "risks", "risk_score")
+
+def _analysis_pieces(analysis: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    yield "summary", analysis.get("summary", "")
+    for field in ("key_clauses", "risks"):
+        for item in analysis.get(field) or []:
+            yield field, item
+    yield "risk_score", analysis.get("risk_score", 50)
+
+def stream_contract_analysis(contract_text: str) -> Iterator[Tuple[str, Any]]:
+    """Yield analysis pieces as soon as they are complete, then ("analysis", result).
+
+    Pieces are ("summary", str), ("key_clauses", clause), ("risks", risk) and
+    ("risk_score", int), parsed incrementally from the token stream. Long
+    contracts yield each chunk's clauses and risks as that chunk finishes, and
+    the merged summary and score at the end. The final analysis is the same
+    (cached) result ``analyze_contract_with_ai`` returns.
+    """
+    cache = get_analysis_cache()
+    cache_key = content_key(contract_text, _model_name(), ANALYSIS_PROMPT_VERSION)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        yield from _analysis_pieces(cached)
+        yield "analysis", copy.deepcopy(cached)
+        return
 
-def generate_negotiation_email(contract_text: str, tone: str = "professional", issues: List[str] = None) -> Dict[str, str]:
-    """Generate negotiation email using Gemini."""
     model = _get_model()
+    try:
+        if needs_chunking(contract_text):
+            chunks = chunk_contract(contract_text)
+            results: Dict[int, Optional[Dict[str, Any]]] = {}
+            seen = set()
+            for index, result in _iter_chunk_analyses(model, chunks):
+                results[index] = result
+                for field in ("key_clauses", "risks"):
+                    for item in (result or {}).get(field) or []:
+                        key = (field,) + _item_key(field, item)
+                        if key not in seen:
+                            seen.add(key)
+                            yield field, item
+            analysis = _merge_chunk_results(chunks, results)
+            yield "summary", analysis["summary"]
+            yield "risk_score", analysis["risk_score"]
+        else:
+            parser = IncrementalObjectParser(item_fields=("key_clauses", "risks"))
+            for delta in _generate_stream(model, _analysis_prompt(contract_text), "analyze"):
+                for field, value in parser.feed(delta):
+                    if field in _STREAMED_FIELDS:
+                        yield field, value
+            analysis = _extract_json(parser.buffer or "{}", "analyze")
+    except json.JSONDecodeError:
+        yield "analysis", _parse_error_analysis(contract_text)
+        return
+    except Exception as e:
+        raise Exception(f"AI analysis failed: {str(e)}")
+    cache.set(cache_key, analysis)
+    yield "analysis", copy.deepcopy(analysis)
+
+_TONE_MAP = {
+    "professional": "Use a professional, respectful tone.",
+    "assertive": "Use a confident, assertive tone while remaining respectful.",
+    "collaborative": "Use a collaborative, partnership-focused tone.",
+    "friendly": "Use a friendly and warm but still professional tone.",
+    "concise": "Be concise and to-the-point while remaining polite.",
+}
+
+def _email_prompt(contract_text: str, tone: str, issues: Optional[List[str]], output: str) -> str:
     issues_text = ""
     if issues:
         issues_text = f"Specific issues to address: {', '.join(issues)}\n"
-    tone_map = {
-        "professional": "Use a professional, respectful tone.",
-        "assertive": "Use a confident, assertive tone while remaining respectful.",
-        "collaborative": "Use a collaborative, partnership-focused tone.",
-        "friendly": "Use a friendly and warm but still professional tone.",
-        "concise": "Be concise and to-the-point while remaining polite.",
-    }
-    user = f"""
+    return f"""
 Based on this contract, draft a negotiation email.
 
 Contract excerpt:
 {contract_text[:4000]}
 
 {issues_text}
-Tone: {tone_map.get(tone, 'Use a professional, respectful tone.')}
+Tone: {_TONE_MAP.get(tone, 'Use a professional, respectful tone.')}
 
-Return JSON with keys subject and body only.
+{output}
 """
+
+def _email_fallback(tone: str, error: Exception) -> Dict[str, str]:
+    return {
+        "subject": f"Contract Review and Discussion - {tone.title()} Approach",
+        "body": f"I've reviewed the contract and would like to discuss some key points. Error in AI generation: {str(error)}",
+        "tone": tone,
+    }
+
+def generate_negotiation_email(contract_text: str, tone: str = "professional", issues: List[str] = None) -> Dict[str, str]:
+    """Generate negotiation email using Gemini."""
+    model = _get_model()
+    user = _email_prompt(contract_text, tone, issues, "Return JSON with keys subject and body only.")
     try:
-        resp = model.generate_content(user)
-        content = resp.text or "{}"
-        result = _extract_json(content)
+        resp = _generate(model, user, "email")
+        content = _response_text(resp)
+        if not content:
+            return _email_fallback(tone, ValueError("the model returned no text"))
+        result = _extract_json(content, "email")
         result["tone"] = tone
         return result
     except Exception as e:
-        return {
-            "subject": f"Contract Review and Discussion - {tone.title()} Approach",
-            "body": f"I've reviewed the contract and would like to discuss some key points. Error in AI generation: {str(e)}",
-            "tone": tone,
-        }
+        return _email_fallback(tone, e)
 
-def answer_contract_question(question: str, contract_text: str) -> str:
-    """Answer questions about the contract using Gemini (grounded on provided text)."""
+_PLAIN_EMAIL_FORMAT = (
+    "Return plain text only (no JSON, no markdown): the first line is \"Subject: <subject>\", "
+    "then a blank line, then the email body."
+)
+
+def stream_negotiation_email(contract_text: str, tone: str = "professional", issues: List[str] = None) -> Iterator[str]:
+    """Yield the email as plain-text deltas ("Subject: ..." line, blank line, body).
+
+    Pass the concatenated output to ``parse_streamed_email`` for the final
+    subject/body/tone payload.
+    """
     model = _get_model()
-    user = f"""
-Answer the question using ONLY the contract text.
+    yield from _generate_stream(model, _email_prompt(contract_text, tone, issues, _PLAIN_EMAIL_FORMAT), "email")
+
+def parse_streamed_email(content: str, tone: str) -> Dict[str, str]:
+    subject, _, body = content.strip().partition("\n")
+    if subject.lower().startswith("subject:"):
+        subject = subject[len("subject:"):]
+    else:
+        subject, body = "", content
+    return {"subject": subject.strip(), "body": body.strip(), "tone": tone}
+
+def _format_passages(passages: List[str]) -> str:
+    return "\n\n".join(f"[Excerpt {i}]\n{p}" for i, p in enumerate(passages, 1))
+
+def _question_prompt(question: str, contract_text: str) -> str:
+    passages = retrieve_passages(contract_text, question)
+    return f"""
+Answer the question using ONLY the contract excerpts below.
 If the answer is not present, say "The contract does not specify." Do not invent facts.
 
 Question: {question}
 
-Contract Text:
-{contract_text[:12000]}
+Contract Excerpts:
+{_format_passages(passages)}
 """
+
+def _answer_key(contract_key: str, question: str) -> str:
+    return content_key(normalize_text(question).lower(), contract_key)
+
+def _contract_key(contract_text: str) -> str:
+    return content_key(contract_text, _model_name(), QUESTION_PROMPT_VERSION)
+
+def answer_contract_question(question: str, contract_text: str) -> str:
+    """Answer questions about the contract using Gemini (grounded on provided text).
+
+    Only the passages most relevant to the question (BM25 over the whole
+    contract) are sent, so clauses anywhere in a long document are reachable.
+    Answers are cached per contract and question.
+    """
+    cache = get_answer_cache()
+    key = _answer_key(_contract_key(contract_text), question)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    model = _get_model()
+    user = _question_prompt(question, contract_text)
     try:
-        resp = model.generate_content(user)
-        return resp.text or ""
+        resp = _generate(model, user, "question")
+        answer = _response_text(resp)
     except Exception as e:
         return f"Error answering question: {str(e)}"
+    if not answer:
+        # Blocked or empty response; not cached so the question can be retried
+        return "Error answering question: the model returned no answer"
+    cache.set(key, answer)
+    return answer
+
+def _questions_prompt(questions: List[str], contract_text: str) -> str:
+    passages = retrieve_passages_for(contract_text, questions, limit=QUESTION_BATCH_MAX_PASSAGES)
+    numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+    return f"""
+Answer each question using ONLY the contract excerpts below.
+If an answer is not present, answer "The contract does not specify." Do not invent facts.
+Always return STRICT valid JSON with the exact schema below.
+
+Questions:
+{numbered}
+
+Contract Excerpts:
+{_format_passages(passages)}
+
+Return exactly this JSON structure, with one entry per question in the same order:
+{{
+  "answers": [
+    {{"id": 1, "answer": "answer to question 1"}}
+  ]
+}}
+"""
+
+def _answer_batch(model: "genai.GenerativeModel", questions: List[str], contract_text: str) -> Dict[int, str]:
+    """Answers by question position from one model call; unparseable or missing entries are left out."""
+    resp = _generate(model, _questions_prompt(questions, contract_text), "questions")
+    try:
+        parsed = _extract_json(_response_text(resp) or "{}", "questions")
+    except json.JSONDecodeError:
+        return {}
+    answers: Dict[int, str] = {}
+    entries = parsed.get("answers") if isinstance(parsed, dict) else None
+    for position, entry in enumerate(entries if isinstance(entries, list) else []):
+        if not isinstance(entry, dict) or not str(entry.get("answer") or "").strip():
+            continue
+        try:
+            index = int(entry.get("id", position + 1)) - 1
+        except (TypeError, ValueError):
+            index = position
+        if 0 <= index < len(questions):
+            answers[index] = str(entry["answer"]).strip()
+    return answers
+
+def answer_contract_questions(questions: List[str], contract_text: str) -> List[Dict[str, Any]]:
+    """Answer several questions about one contract with a single Gemini call.
+
+    Cached answers are reused; the rest are asked together over the union of
+    their most relevant passages. Any question the batched response misses is
+    asked on its own. Returns {"question", "answer", "cached"} per question,
+    in order.
+    """
+    cache = get_answer_cache()
+    contract_key = _contract_key(contract_text)
+    keys = [_answer_key(contract_key, q) for q in questions]
+    answers: Dict[str, str] = {}
+    cached = set()
+    pending: Dict[str, str] = {}  # answer key -> question, first occurrence
+    for question, key in zip(questions, keys):
+        if key in answers or key in pending:
+            continue
+        hit = cache.get(key)
+        if hit is not None:
+            answers[key] = hit
+            cached.add(key)
+        else:
+            pending[key] = question
+
+    if len(pending) > 1:
+        batch = list(pending.items())
+        try:
+            fresh = _answer_batch(_get_model(), [q for _, q in batch], contract_text)
+        except Exception as e:
+            raise Exception(f"Question answering failed: {str(e)}")
+        for index, (key, _) in enumerate(batch):
+            if index in fresh:
+                answers[key] = fresh[index]
+                cache.set(key, fresh[index])
+                del pending[key]
+    for key, question in pending.items():
+        answers[key] = answer_contract_question(question, contract_text)
+
+    return [
+        {"question": question, "answer": answers[key], "cached": key in cached}
+        for question, key in zip(questions, keys)
+    ]
+
+def stream_contract_answer(question: str, contract_text: str) -> Iterator[str]:
+    """Yield the answer to a contract question as text deltas while Gemini generates it."""
+    cache = get_answer_cache()
+    key = _answer_key(_contract_key(contract_text), question)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    model = _get_model()
+    parts = []
+    for delta in _generate_stream(model, _question_prompt(question, contract_text), "question"):
+        parts.append(delta)
+        yield delta
+    if parts:
+        cache.set(key, "".join(parts))
@@ -0,0 +1,106 @@
+"""
+Transactional credits ledger backed by SQLite (safe across worker processes)
+"""
+import json
+import time
+from pathlib import Path
+from typing import Dict
+
+from backend.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS credits (
+    email TEXT PRIMARY KEY,
+    credits INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+class CreditsStore:
+    """Per-email credit balances with atomic increments.
+
+    Every write is a single statement or an IMMEDIATE transaction, so concurrent
+    webhooks in different uvicorn workers cannot lose each other's updates.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        connect(db_path, durable=True).executescript(_SCHEMA)
+
+    def _db(self):
+        return connect(self.db_path, durable=True)
+
+    def get(self, email: str) -> int:
+        row = self._db().execute("SELECT credits FROM credits WHERE email = ?", (normalize_email(email),)).fetchone()
+        return int(row[0]) if row else 0
+
+    def add(self, email: str, amount: int) -> int:
+        """Atomically add ``amount`` to the balance and return the new balance."""
+        db = self._db()
+        key = normalize_email(email)
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            self.increment_in(db, key, int(amount))
+            balance = db.execute("SELECT credits FROM credits WHERE email = ?", (key,)).fetchone()[0]
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return int(balance)
+
+    def set(self, email: str, amount: int) -> None:
+        self._db().execute(
+            "INSERT INTO credits (email, credits, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(email) DO UPDATE SET credits = excluded.credits, updated_at = excluded.updated_at",
+            (normalize_email(email), int(amount), time.time()),
+        )
+
+    @staticmethod
+    def increment_in(db, email: str, amount: int) -> None:
+        """Upsert-increment within a caller's open transaction on the same database."""
+        db.execute(
+            "INSERT INTO credits (email, credits, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(email) DO UPDATE SET credits = credits + excluded.credits, updated_at = excluded.updated_at",
+            (normalize_email(email), amount, time.time()),
+        )
+
+    def migrate_json(self, path: Path) -> int:
+        """One-time import of the legacy credits.json; the file is renamed afterwards.
+
+        Guarded by a flag in the database, so only one worker ever imports it.
+        """
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            done = db.execute("SELECT value FROM meta WHERE key = 'credits_json_migrated'").fetchone()
+            if done or not path.exists():
+                db.execute("COMMIT")
+                return 0
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    legacy: Dict[str, int] = {email: int(amount) for email, amount in json.load(f).items()}
+            except (ValueError, TypeError, AttributeError) as e:
+                # Left in place (and unflagged) for manual recovery; workers still start
+                print(f"[Credits] Could not import {path}: {e}")
+                db.execute("ROLLBACK")
+                return 0
+            for email, amount in legacy.items():
+                self.increment_in(db, normalize_email(email), amount)
+            db.execute(
+                "INSERT INTO meta (key, value) VALUES ('credits_json_migrated', ?)", (str(time.time()),)
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        path.rename(path.with_name(path.name + ".migrated"))
+        return len(legacy)
@@ -0,0 +1,44 @@
+"""
+SQLite connection helper shared by the embedded stores
+"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Set
+
+_local = threading.local()
+
+
+def connect(path: Path, durable: bool = False) -> sqlite3.Connection:
+    """Return this thread's connection to ``path``, opening it on first use.
+
+    Connections run in WAL mode with a busy timeout so several uvicorn worker
+    processes can share one database file; writers should use
+    ``BEGIN IMMEDIATE`` to serialize read-modify-write sequences.
+
+    Commits use ``synchronous=NORMAL``, which can lose the latest commits on
+    power loss. ``durable=True`` switches the connection to ``FULL`` so a
+    commit is on disk when it returns (billing data that is acknowledged to
+    a sender right after committing).
+    """
+    conns: Dict[str, sqlite3.Connection] = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    key = str(path)
+    conn = conns.get(key)
+    if conn is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(key, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conns[key] = conn
+    if durable:
+        full: Set[str] = getattr(_local, "full", None)
+        if full is None:
+            full = _local.full = set()
+        if key not in full:
+            conn.execute("PRAGMA synchronous=FULL")
+            full.add(key)
+    return conn
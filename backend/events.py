@@ -0,0 +1,89 @@
+"""
+Idempotency store for webhook event IDs, with TTL-based expiry
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from backend.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_events (
+    event_id TEXT PRIMARY KEY,
+    processed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS processed_events_processed_at ON processed_events (processed_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ProcessedEvents:
+    """Records which webhook events have been handled.
+
+    ``claim_in`` is an atomic check-and-set on the primary key inside the
+    caller's transaction, so two concurrent deliveries of the same event cannot
+    both be processed. IDs older than ``ttl_seconds`` are purged by ``expire``
+    to keep the table bounded.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: float = 30 * 24 * 3600):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        connect(db_path, durable=True).executescript(_SCHEMA)
+        self.expire()
+
+    def _db(self) -> sqlite3.Connection:
+        return connect(self.db_path, durable=True)
+
+    def seen(self, event_id: str) -> bool:
+        return self._db().execute(
+            "SELECT 1 FROM processed_events WHERE event_id = ?", (event_id,)
+        ).fetchone() is not None
+
+    @staticmethod
+    def claim_in(db: sqlite3.Connection, event_id: str) -> bool:
+        """Claim within a caller's open transaction on the same database."""
+        cur = db.execute(
+            "INSERT OR IGNORE INTO processed_events (event_id, processed_at) VALUES (?, ?)",
+            (event_id, time.time()),
+        )
+        return cur.rowcount > 0
+
+    def expire(self) -> int:
+        if self.ttl_seconds <= 0:
+            return 0
+        cur = self._db().execute(
+            "DELETE FROM processed_events WHERE processed_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        return cur.rowcount
+
+    def migrate_json(self, path: Path) -> int:
+        """One-time import of the legacy processed_events.json; the file is renamed afterwards."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            done = db.execute("SELECT value FROM meta WHERE key = 'events_json_migrated'").fetchone()
+            if done or not path.exists():
+                db.execute("COMMIT")
+                return 0
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+            except ValueError:
+                legacy = {}
+            now = time.time()
+            db.executemany(
+                "INSERT OR IGNORE INTO processed_events (event_id, processed_at) VALUES (?, ?)",
+                [(event_id, now) for event_id, processed in legacy.items() if processed],
+            )
+            db.execute("INSERT INTO meta (key, value) VALUES ('events_json_migrated', ?)", (str(now),))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        path.rename(path.with_name(path.name + ".migrated"))
+        return len(legacy)
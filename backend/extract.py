@@ -0,0 +1,302 @@
+"""
+Text extraction for uploaded contract files (PDF, DOCX, TXT)
+"""
+import math
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional, Tuple
+from xml.etree import ElementTree
+
+from backend import metrics
+
+if TYPE_CHECKING:
+    import PyPDF2
+
+# PDFs with at least this many pages are split into page ranges and extracted
+# in parallel when a process pool is available
+PDF_SHARD_MIN_PAGES = int(os.getenv("PDF_SHARD_MIN_PAGES", "24"))
+# Pages per shard; 0 picks a size that gives each pool worker ~2 shards
+PDF_SHARD_SIZE = int(os.getenv("PDF_SHARD_SIZE", "0"))
+# Pages slower than this are logged so problem documents can be tracked down
+PDF_SLOW_PAGE_SECONDS = float(os.getenv("PDF_SLOW_PAGE_SECONDS", "2.0"))
+
+
+class PageText(NamedTuple):
+    index: int
+    text: str
+    seconds: float
+    error: Optional[str] = None
+
+
+def _extract_pages(reader: "PyPDF2.PdfReader", start: int, end: int) -> List[PageText]:
+    pages = []
+    for index in range(start, end):
+        started = time.perf_counter()
+        try:
+            text = reader.pages[index].extract_text() or ""
+            error = None
+        except Exception as e:
+            text, error = "", str(e) or type(e).__name__
+        pages.append(PageText(index, text, time.perf_counter() - started, error))
+    return pages
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[PageText]:
+    """Pool worker: open the PDF independently and extract pages [start, end)."""
+    import PyPDF2
+
+    return _extract_pages(PyPDF2.PdfReader(file_path), start, end)
+
+
+def _shard_ranges(page_count: int, executor: Executor) -> List[tuple]:
+    size = PDF_SHARD_SIZE
+    if size <= 0:
+        workers = getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+        size = max(4, math.ceil(page_count / (workers * 2)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_pdf_pages(file_path: Path, executor: Optional[Executor] = None) -> List[PageText]:
+    """Extract every page of a PDF in order, with per-page timing.
+
+    When ``executor`` is given and the document is large enough, page ranges are
+    extracted concurrently on it. Pages that fail are returned with ``error`` set
+    instead of aborting the document.
+    """
+    import PyPDF2
+
+    started = time.perf_counter()
+    reader = PyPDF2.PdfReader(str(file_path))
+    page_count = len(reader.pages)
+    if executor is None or page_count < PDF_SHARD_MIN_PAGES:
+        pages = _extract_pages(reader, 0, page_count)
+    else:
+        futures = [
+            executor.submit(_extract_page_range, str(file_path), start, end)
+            for start, end in _shard_ranges(page_count, executor)
+        ]
+        pages = [page for future in futures for page in future.result()]
+    metrics.DOCUMENT_PAGES.observe(page_count)
+
+    for page in pages:
+        metrics.PDF_PAGE_SECONDS.observe(page.seconds, outcome="error" if page.error else "ok")
+    failed = [p.index + 1 for p in pages if p.error]
+    if failed:
+        print(f"[Extract] {file_path.name}: skipped {len(failed)} unreadable page(s): {failed[:20]}")
+    slow = [p for p in pages if p.seconds >= PDF_SLOW_PAGE_SECONDS]
+    if slow:
+        slowest = max(slow, key=lambda p: p.seconds)
+        print(
+            f"[Extract] {file_path.name}: {page_count} pages in {time.perf_counter() - started:.2f}s, "
+            f"{len(slow)} slow page(s), slowest page {slowest.index + 1} took {slowest.seconds:.2f}s"
+        )
+    return pages
+
+
+def extract_text_from_pdf(file_path: Path, executor: Optional[Executor] = None) -> str:
+    """Extract text from PDF file"""
+    return "".join(page.text + "\n" for page in extract_pdf_pages(file_path, executor) if not page.error)
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_BODY_PART = "word/document.xml"
+# Parts read after the body, in this order (headers/footers may be numbered)
+_DOCX_EXTRA_PARTS = re.compile(r"word/(header|footer)(\d*)\.xml|word/(footnotes|endnotes)\.xml")
+_DOCX_PART_ORDER = {"header": 0, "footer": 1, "footnotes": 2, "endnotes": 3}
+
+
+def _docx_part_lines(archive: zipfile.ZipFile, name: str) -> Iterator[str]:
+    """Yield one line per paragraph of a WordprocessingML part, and one per table row.
+
+    Parsed with iterparse and cleared as it goes, so memory stays flat however
+    long the document is. Table rows are emitted as ``cell | cell | ...`` so
+    schedules keep their row structure; nested tables are folded into their
+    cell's text. Deleted revisions and compatibility fallbacks (duplicate
+    copies of text boxes) are skipped.
+    """
+    paragraphs: List[List[str]] = []  # open paragraphs (text boxes nest inside runs)
+    rows: List[List[List[str]]] = []  # open table rows: cells, each a list of paragraph texts
+    skip = 0
+    body = None
+    with archive.open(name) as part:
+        for event, elem in ElementTree.iterparse(part, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == _MC_FALLBACK:
+                    skip += 1
+                elif skip:
+                    pass
+                elif tag == _W + "p":
+                    paragraphs.append([])
+                elif tag == _W + "tr":
+                    rows.append([])
+                elif tag == _W + "tc" and rows:
+                    rows[-1].append([])
+                elif tag == _W + "body":
+                    body = elem
+                continue
+
+            if tag == _MC_FALLBACK:
+                skip -= 1
+            elif skip:
+                continue
+            elif paragraphs and tag == _W + "t":
+                paragraphs[-1].append(elem.text or "")
+            elif paragraphs and tag == _W + "tab":
+                paragraphs[-1].append("\t")
+            elif paragraphs and tag in (_W + "br", _W + "cr"):
+                # Line breaks only; page and column breaks carry no text
+                if elem.get(_W + "type", "textWrapping") == "textWrapping":
+                    paragraphs[-1].append("\n")
+            elif tag == _W + "p" and paragraphs:
+                text = "".join(paragraphs.pop())
+                if paragraphs:
+                    # Text box inside a run: keep it with the enclosing paragraph
+                    paragraphs[-1].append(" " + text)
+                elif rows and rows[-1]:
+                    rows[-1][-1].append(text)
+                else:
+                    yield text
+                elem.clear()
+            elif tag == _W + "tr" and rows:
+                cells = rows.pop()
+                line = " | ".join(" ".join(t for t in cell if t) for cell in cells)
+                if rows and rows[-1]:
+                    rows[-1][-1].append(line)
+                elif line.strip(" |"):
+                    yield line
+                elem.clear()
+            elif tag in (_W + "tc", _W + "tbl"):
+                elem.clear()
+            if body is not None and tag != _W + "body" and not paragraphs and not rows:
+                # Finished a top-level block: drop what the tree has accumulated
+                body.clear()
+
+
+def iter_docx_lines(file_path: Path) -> Iterator[str]:
+    """Lines of a DOCX: the body first, then headers, footers, footnotes and endnotes.
+
+    Header/footer/note lines that are empty or repeat an earlier one (e.g. the
+    same header on first and default pages) are dropped.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        names = archive.namelist()
+        if _DOCX_BODY_PART not in names:
+            raise ValueError("Not a Word document: word/document.xml is missing")
+        yield from _docx_part_lines(archive, _DOCX_BODY_PART)
+
+        extra = []
+        for name in names:
+            match = _DOCX_EXTRA_PARTS.fullmatch(name)
+            if match:
+                kind = match.group(1) or match.group(3)
+                extra.append((_DOCX_PART_ORDER[kind], int(match.group(2) or 0), name))
+        seen = set()
+        for _, _, name in sorted(extra):
+            for line in _docx_part_lines(archive, name):
+                key = line.strip()
+                if key and key not in seen:
+                    seen.add(key)
+                    yield line
+
+
+def extract_text_from_docx(file_path: Path) -> str:
+    """Extract text from DOCX file, including tables, headers, footers and notes"""
+    return "".join(line + "\n" for line in iter_docx_lines(file_path))
+
+
+def preload_parsers() -> None:
+    """Import the PDF library ahead of the first upload (startup pre-warm)."""
+    import PyPDF2  # noqa: F401
+
+
+def extract_text_from_file(file_path: Path, executor: Optional[Executor] = None) -> str:
+    """Extract text based on file extension.
+
+    ``executor`` is only used for PDFs, to extract page ranges in parallel.
+    """
+    extension = file_path.suffix.lower()
+
+    if extension == '.pdf':
+        return extract_text_from_pdf(file_path, executor)
+    elif extension == '.docx':
+        return extract_text_from_docx(file_path)
+    elif extension == '.txt':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    else:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+
+def _iter_pdf_text(reader: "PyPDF2.PdfReader") -> Iterator[str]:
+    for index in range(len(reader.pages)):
+        page = _extract_pages(reader, index, index + 1)[0]
+        if not page.error:
+            yield page.text + "\n"
+
+
+def iter_text_from_file(file_path: Path) -> Iterator[str]:
+    """Yield a file's text incrementally: a page at a time for PDFs, a line at a time otherwise.
+
+    The pieces concatenate to ``extract_text_from_file``'s result, and nothing
+    past the point where the caller stops iterating is parsed.
+    """
+    extension = file_path.suffix.lower()
+
+    if extension == '.pdf':
+        import PyPDF2
+
+        yield from _iter_pdf_text(PyPDF2.PdfReader(str(file_path)))
+    elif extension == '.docx':
+        for line in iter_docx_lines(file_path):
+            yield line + "\n"
+    elif extension == '.txt':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from f
+    else:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+
+class TextPrefix(NamedTuple):
+    text: str
+    complete: bool  # the text is the whole document
+    pages: Optional[int] = None  # PDF page count
+
+
+def extract_text_prefix(file_path: Path, max_chars: int) -> TextPrefix:
+    """Extract text until at least ``max_chars`` characters are in hand.
+
+    The text is whole pages or lines, so it may run past ``max_chars``. The
+    page count is returned rather than recorded in ``metrics`` because this
+    usually runs in a pool process, whose metrics are never scraped.
+    """
+    pages = None
+    if file_path.suffix.lower() == '.pdf':
+        import PyPDF2
+
+        reader = PyPDF2.PdfReader(str(file_path))
+        pages = len(reader.pages)
+        texts = _iter_pdf_text(reader)
+    else:
+        texts = iter_text_from_file(file_path)
+    pieces: List[str] = []
+    total = 0
+    try:
+        for piece in texts:
+            pieces.append(piece)
+            total += len(piece)
+            if total >= max_chars:
+                # Complete only if nothing else follows
+                for rest in texts:
+                    if rest:
+                        pieces.append(rest)
+                        return TextPrefix("".join(pieces), False, pages)
+                break
+    finally:
+        texts.close()
+    return TextPrefix("".join(pieces), True, pages)
@@ -0,0 +1,223 @@
+"""
+Bulk contract ingestion: python -m backend.ingest <directory-or-zip>
+
+Extracts text in a process pool, analyzes with bounded concurrency and writes
+results to the same contract store the API serves. Progress is checkpointed
+per file (by SHA-256), so an interrupted run resumes where it stopped.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.blobs import BlobStore, file_sha256
+from backend.contract_ai import analyze_contract_with_ai
+from backend.db import connect
+from backend.extract import extract_text_from_file
+
+ALLOWED_EXTENSIONS = {".pdf", ".docx", ".txt"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_log (
+    sha256 TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    contract_id TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def iter_sources(path: Path, scratch: Path) -> Iterator[Tuple[str, Path]]:
+    """Yield (source label, local file) for every supported file in a directory or zip."""
+    if path.is_dir():
+        for file_path in sorted(path.rglob("*")):
+            if file_path.is_file() and file_path.suffix.lower() in ALLOWED_EXTENSIONS:
+                yield str(file_path), file_path
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for index, info in enumerate(archive.infolist()):
+                suffix = Path(info.filename).suffix.lower()
+                if info.is_dir() or suffix not in ALLOWED_EXTENSIONS:
+                    continue
+                target = scratch / f"{index}{suffix}"
+                with archive.open(info) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                yield f"{path}:{info.filename}", target
+    else:
+        raise ValueError(f"{path} is neither a directory nor a zip archive")
+
+
+class _Job:
+    __slots__ = ("source", "path", "sha256", "contract_id", "text")
+
+    def __init__(self, source: str, path: Path, sha256: str):
+        self.source = source
+        self.path = path
+        self.sha256 = sha256
+        self.contract_id: Optional[str] = None
+        self.text: Optional[str] = None
+
+
+class Ingestor:
+    def __init__(self, store, blobs: BlobStore, workers: int, concurrency: int, analyze: bool = True):
+        self.store = store
+        self.blobs = blobs
+        self.workers = workers
+        self.concurrency = concurrency
+        self.analyze = analyze
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+        connect(store.db_path).executescript(_SCHEMA)
+
+    def _log(self, job: _Job, status: str, error: Optional[str] = None) -> None:
+        connect(self.store.db_path).execute(
+            "INSERT OR REPLACE INTO ingest_log (sha256, source, contract_id, status, error, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job.sha256, job.source, job.contract_id, status, error, time.time()),
+        )
+
+    def _previous(self, sha256: str) -> Tuple[Optional[str], Optional[str]]:
+        """Status and contract ID an earlier run logged for this content."""
+        row = connect(self.store.db_path).execute(
+            "SELECT status, contract_id FROM ingest_log WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        return (row["status"], row["contract_id"]) if row is not None else (None, None)
+
+    def _take_reference(self, job: _Job) -> None:
+        """Hold the job's blob reference, logged as "extracted" in the same transaction.
+
+        A job resumed from an "extracted" row already holds its reference and
+        keeps that contract ID, so a crash between extraction and the store
+        write neither leaks the reference nor takes a second one.
+        """
+        if job.contract_id:
+            return
+        db = connect(self.store.db_path)
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            self.blobs.put_in(db, job.path, job.sha256, job.path.suffix, copy=True)
+            job.contract_id = f"{uuid.uuid4()}{job.path.suffix.lower()}"
+            self._log(job, "extracted")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            job.contract_id = None
+            raise
+
+    def _finish(self, job: _Job, analysis) -> None:
+        self.store.add(
+            job.contract_id, Path(job.source).name, job.path.stat().st_size, job.sha256, job.text, analysis
+        )
+        self._log(job, "done")
+        self.done += 1
+
+    def _fail(self, job: _Job, error: Exception) -> None:
+        if job.contract_id:
+            self.blobs.release(job.sha256, Path(job.contract_id).suffix)
+            job.contract_id = None
+        self._log(job, "failed", f"{type(error).__name__}: {error}")
+        self.failed += 1
+        print(f"[Ingest] failed {job.source}: {error}", file=sys.stderr)
+
+    def report(self, final: bool = False) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed * 60 if elapsed > 0 else 0.0
+        line = (
+            f"[Ingest] {'finished' if final else 'progress'}: {self.done} done, {self.failed} failed, "
+            f"{self.skipped} skipped in {elapsed:.1f}s ({rate:.1f} documents/min)"
+        )
+        print(line, file=sys.stderr)
+        return line
+
+    def run(self, sources: Iterator[Tuple[str, Path]]) -> None:
+        max_in_flight = self.workers + 2 * self.concurrency
+        seen = set()
+        in_flight: Dict[Future, Tuple[str, _Job]] = {}
+        last_report = time.monotonic()
+        sources = iter(sources)
+        exhausted = False
+        with ProcessPoolExecutor(max_workers=self.workers) as extract_pool, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as analyze_pool:
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    try:
+                        source, path = next(sources)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    sha256 = file_sha256(path)
+                    status, contract_id = self._previous(sha256)
+                    if sha256 in seen or status == "done":
+                        self.skipped += 1
+                        continue
+                    seen.add(sha256)
+                    job = _Job(source, path, sha256)
+                    if status == "extracted":
+                        job.contract_id = contract_id
+                    in_flight[extract_pool.submit(extract_text_from_file, path)] = ("extract", job)
+                if not in_flight:
+                    continue
+
+                finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, job = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self._fail(job, e)
+                        continue
+                    try:
+                        if stage == "extract":
+                            job.text = result
+                            self._take_reference(job)
+                            if self.analyze:
+                                in_flight[analyze_pool.submit(analyze_contract_with_ai, result)] = ("analyze", job)
+                            else:
+                                self._finish(job, None)
+                        else:
+                            self._finish(job, result)
+                    except Exception as e:
+                        self._fail(job, e)
+
+                if time.monotonic() - last_report >= 10:
+                    self.report()
+                    last_report = time.monotonic()
+        self.report(final=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.ingest", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", type=Path, help="Directory or .zip of PDF/DOCX/TXT contracts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent Gemini analyses")
+    parser.add_argument("--no-analyze", action="store_true", help="Only extract and store text")
+    args = parser.parse_args(argv)
+
+    # Imported here so the API's env loading and stores are set up exactly as in the server
+    from backend.main import contract_store, upload_blobs
+
+    ingestor = Ingestor(
+        contract_store,
+        upload_blobs,
+        workers=max(1, args.workers),
+        concurrency=max(1, args.concurrency),
+        analyze=not args.no_analyze,
+    )
+    with tempfile.TemporaryDirectory(prefix="ingest-") as scratch:
+        ingestor.run(iter_sources(args.path, Path(scratch)))
+    return 1 if ingestor.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
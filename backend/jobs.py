@@ -0,0 +1,131 @@
+"""
+Bounded in-process job queue for long-running upload processing
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class Job:
+    """One queued unit of work, with per-stage timing for status polling."""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = "queued"
+        self.stage = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self._stage_started = time.perf_counter()
+
+    def enter(self, stage: str) -> None:
+        """Close the timer for the current stage and start ``stage``."""
+        now = time.perf_counter()
+        self.timings[self.stage] = round(self.timings.get(self.stage, 0.0) + now - self._stage_started, 6)
+        self.stage = stage
+        self._stage_started = now
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "timings": self.timings,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobQueue:
+    """Runs ``handler(job)`` for submitted jobs on ``concurrency`` worker tasks.
+
+    At most ``max_pending`` jobs wait at once; finished jobs are kept for
+    ``ttl_seconds`` so clients can poll for the result. State is per process:
+    behind several workers, route polling back to the worker that took the job.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Job], Awaitable[Any]],
+        concurrency: int = 4,
+        max_pending: int = 1000,
+        ttl_seconds: float = 3600,
+    ):
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, payload: Dict[str, Any]) -> Job:
+        self.start()
+        self._prune()
+        job = Job(payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError("Job queue is full")
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if job.finished_at is None or job.finished_at > cutoff:
+                break
+            self._jobs.popitem(last=False)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            job.enter("running")
+            try:
+                job.result = await self.handler(job)
+                job.status = "done"
+            except asyncio.CancelledError:
+                job.status, job.error = "failed", "Cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = getattr(e, "detail", None) or str(e)
+            finally:
+                job.enter("done" if job.status == "done" else "failed")
+                job.finished_at = time.time()
+                self._queue.task_done()
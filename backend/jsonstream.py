@@ -0,0 +1,155 @@
+"""
+Incremental JSON parser for streamed analysis responses
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class _Frame:
+    __slots__ = ("kind", "start", "key", "expect_key", "current_key")
+
+    def __init__(self, kind: str, start: int, key: Optional[str]):
+        self.kind = kind
+        self.start = start
+        self.key = key
+        self.expect_key = kind == "obj"
+        self.current_key: Optional[str] = None
+
+
+class IncrementalObjectParser:
+    """Consume a top-level JSON object a chunk at a time and report pieces as they complete.
+
+    ``feed`` returns ``(field, value)`` pairs:
+
+    * every element of a top-level array field listed in ``item_fields`` as soon
+      as that element's closing bracket arrives, e.g. ``("risks", {...})``;
+    * every other top-level field once its value is complete, e.g.
+      ``("summary", "...")`` (whole arrays/objects not in ``item_fields``
+      are reported when they close).
+
+    The object starts at the first ``{`` when only whitespace precedes it,
+    otherwise at the first ``{`` after a ```json fence, matching what the
+    final ``json.loads`` of the response accepts. Text after the object
+    closes is not parsed but is kept in ``buffer`` with the rest.
+    """
+
+    def __init__(self, item_fields: Tuple[str, ...] = ()):
+        self.item_fields = item_fields
+        self.buffer = ""
+        self.done = False
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._string_is_key = False
+        self._scalar_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        # Text after the object (a closing ``` fence) still goes into buffer,
+        # which callers parse in full once the stream ends
+        self.buffer += chunk
+        if self.done:
+            return []
+        events: List[Tuple[str, Any]] = []
+        buf = self.buffer
+        stack = self._stack
+        i = self._pos
+        n = len(buf)
+        if not stack:
+            start = self._object_start(buf)
+            if start is None:
+                self._pos = n
+                return events
+            stack.append(_Frame("obj", start, None))
+            i = start + 1
+        while i < n:
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._string_closed(i, events)
+                i += 1
+                continue
+            top = stack[-1]
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                self._string_is_key = top.kind == "obj" and top.expect_key
+            elif c in "{[":
+                key = top.current_key if top.kind == "obj" else None
+                stack.append(_Frame("obj" if c == "{" else "arr", i, key))
+            elif c in "}]":
+                if len(stack) == 1:
+                    self._flush_scalar(i, events)
+                frame = stack.pop()
+                self._container_closed(frame, i, events)
+                if not stack:
+                    self.done = True
+                    i += 1
+                    break
+            elif c == ":":
+                top.expect_key = False
+            elif c == ",":
+                if len(stack) == 1:
+                    self._flush_scalar(i, events)
+                if top.kind == "obj":
+                    top.expect_key = True
+            elif c not in _WHITESPACE and len(stack) == 1 and self._scalar_start is None:
+                self._scalar_start = i
+            i += 1
+        self._pos = i
+        return events
+
+    @staticmethod
+    def _object_start(buf: str) -> Optional[int]:
+        lead = len(buf) - len(buf.lstrip(_WHITESPACE))
+        if lead < len(buf) and buf[lead] == "{":
+            return lead
+        fence = buf.find("```json")
+        if fence < 0:
+            return None
+        start = buf.find("{", fence + len("```json"))
+        return start if start >= 0 else None
+
+    def _string_closed(self, end: int, events: List[Tuple[str, Any]]) -> None:
+        top = self._stack[-1]
+        if not self._string_is_key and len(self._stack) != 1:
+            return
+        try:
+            value = json.loads(self.buffer[self._string_start:end + 1])
+        except ValueError:
+            value = None
+        if self._string_is_key:
+            top.current_key = value
+        elif value is not None:
+            events.append((top.current_key, value))
+
+    def _flush_scalar(self, end: int, events: List[Tuple[str, Any]]) -> None:
+        if self._scalar_start is None:
+            return
+        raw = self.buffer[self._scalar_start:end].strip()
+        self._scalar_start = None
+        try:
+            events.append((self._stack[0].current_key, json.loads(raw)))
+        except ValueError:
+            pass
+
+    def _container_closed(self, frame: _Frame, end: int, events: List[Tuple[str, Any]]) -> None:
+        stack = self._stack
+        if len(stack) == 2 and stack[-1].kind == "arr" and stack[-1].key in self.item_fields:
+            field = stack[-1].key
+        elif len(stack) == 1 and frame.key not in self.item_fields:
+            field = frame.key
+        else:
+            return
+        try:
+            events.append((field, json.loads(self.buffer[frame.start:end + 1])))
+        except ValueError:
+            pass
@@ -0,0 +1,132 @@
+"""
+Flow control for upstream model calls: single-flight coalescing and adaptive concurrency
+"""
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# HTTP statuses (and google.api_core exception names) that mean "back off and retry"
+_OVERLOAD_STATUS = {429, 500, 502, 503, 504}
+_OVERLOAD_ERRORS = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "BadGateway",
+    "GatewayTimeout",
+    "DeadlineExceeded",
+}
+
+
+def backoff_delay(attempt: int, base_delay: float = 0.5, max_delay: float = 8.0) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (0-based)."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def is_overload_error(error: BaseException) -> bool:
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and code in _OVERLOAD_STATUS:
+        return True
+    return type(error).__name__ in _OVERLOAD_ERRORS
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit shared by all threads.
+
+    The limit grows by roughly one slot per window of successful calls and is
+    halved whenever upstream signals overload (429/5xx), never dropping below
+    ``min_limit`` or exceeding ``max_limit``.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.overloads = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, overloaded: bool = False, succeeded: bool = True) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                self.overloads += 1
+                self.limit = max(float(self.min_limit), self.limit / 2)
+            elif succeeded:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def call(self, fn: Callable[[], Any], retries: int = 3, base_delay: float = 0.5, max_delay: float = 8.0) -> Any:
+        """Run ``fn`` in a slot, retrying overload errors with full-jitter exponential backoff."""
+        for attempt in range(retries + 1):
+            self.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                overloaded = is_overload_error(e)
+                self.release(overloaded=overloaded, succeeded=False)
+                if not overloaded or attempt == retries:
+                    raise
+                time.sleep(backoff_delay(attempt, base_delay, max_delay))
+                continue
+            self.release()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"limit": int(self.limit), "in_flight": self.in_flight, "overloads": self.overloads}
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller runs ``fn``; callers arriving while it is in flight wait
+    and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
@@ -1,19 +1,45 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import aiofiles
+import asyncio
 import os
 from pathlib import Path
 import uuid
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from urllib.parse import urlencode
-import PyPDF2
-from docx import Document
 from dotenv import load_dotenv
 import json
 import re
-from backend.contract_ai import analyze_contract_with_ai, generate_negotiation_email, answer_contract_question
+from backend.contract_ai import (
+    analyze_contract_with_ai,
+    forget_contract_analysis,
+    generate_negotiation_email,
+    answer_contract_question,
+    answer_contract_questions,
+    get_analysis_cache,
+    get_answer_cache,
+    QUESTION_BATCH_MAX,
+    stream_negotiation_email,
+    parse_streamed_email,
+    stream_contract_answer,
+    stream_contract_analysis,
+    warm_up_model,
+    model_call_stats,
+)
+from backend.clauses import local_analysis
+from backend.retrieval import retrieval_stats
+from backend.similarity import get_similarity_index
+from backend.concurrency import extract_prefix_in_pool, extract_text_in_pool, run_model_call, stream_model_call, shutdown_executors
+from backend.extract import preload_parsers
+from backend.blobs import BlobStore
+from backend.store import ContractStore
+from backend.credits import CreditsStore
+from backend.events import ProcessedEvents
+from backend.webhooks import WebhookInbox, dodo_credit_grant
+from backend.jobs import Job, JobQueue, QueueFullError
+from backend import metrics
 import hmac
 import hashlib
 
@@ -31,6 +57,28 @@ app = FastAPI(
 
 # Gemini env presence will be checked lazily in contract_ai
 
+_prewarm_task: Optional[asyncio.Task] = None
+
+async def _prewarm():
+    # Heavy imports (PDF/DOCX parsers, the Gemini SDK), client construction and
+    # the TLS handshake, paid in the background instead of by the first request
+    await asyncio.to_thread(preload_parsers)
+    if os.getenv("GEMINI_API_KEY") and os.getenv("GEMINI_WARMUP", "true").lower() not in {"0", "false", "no"}:
+        await run_model_call(warm_up_model)
+
+@app.on_event("startup")
+async def _start_prewarm():
+    # Not awaited: startup (and light endpoints like /health) never wait on it
+    global _prewarm_task
+    if os.getenv("STARTUP_PREWARM", "true").lower() not in {"0", "false", "no"}:
+        _prewarm_task = asyncio.create_task(_prewarm())
+
+@app.on_event("shutdown")
+async def _shutdown_executors():
+    if _prewarm_task is not None:
+        _prewarm_task.cancel()
+    shutdown_executors()
+
 # Pydantic models
 class ContractAnalysis(BaseModel):
     summary: str
@@ -45,10 +93,17 @@ class NegotiationEmail(BaseModel):
 
 class QuestionRequest(BaseModel):
     question: str
-    contract_text: str
+    contract_text: Optional[str] = None
+    contract_id: Optional[str] = None
+
+class QuestionsRequest(BaseModel):
+    questions: List[str]
+    contract_text: Optional[str] = None
+    contract_id: Optional[str] = None
 
 class EmailRequest(BaseModel):
-    contract_text: str
+    contract_text: Optional[str] = None
+    contract_id: Optional[str] = None
     tone: str = "professional"
     issues: Optional[List[str]] = None
 
@@ -72,44 +127,54 @@ DATA_DIR = BASE_DATA_DIR / "data"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-# Simple persistent stores
-_CREDITS_FILE = DATA_DIR / "credits.json"
-_EVENTS_FILE = DATA_DIR / "processed_events.json"
+# Uploaded files, stored once per content hash under UPLOAD_DIR/ab/cd/ and
+# evicted by the background sweeper once past the age or total-size quota
+upload_blobs = BlobStore(
+    UPLOAD_DIR,
+    DATA_DIR / "contracts.db",
+    max_age_seconds=float(os.getenv("UPLOAD_MAX_AGE_SECONDS", str(7 * 24 * 3600))),
+    max_bytes=int(os.getenv("UPLOAD_MAX_BYTES", str(1024 * 1024 * 1024))),
+)
+UPLOAD_SWEEP_INTERVAL_SECONDS = float(os.getenv("UPLOAD_SWEEP_INTERVAL_SECONDS", "300"))
 
-def _load_json(path: Path, default):
-    try:
-        if not path.exists():
-            return default
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return default
+# Extracted text and analyses of uploaded contracts, addressed by their saved_as name
+contract_store = ContractStore(DATA_DIR / "contracts.db", DATA_DIR / "contracts")
+contract_store.backfill(UPLOAD_DIR, upload_blobs)
 
-def _save_json(path: Path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+# Upload limits: files are streamed to disk in UPLOAD_CHUNK_SIZE pieces and
+# rejected with 413 once they exceed MAX_FILE_SIZE bytes
+MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+# When set, uploads are analyzed from the first ~N extracted characters and the
+# rest of the document is extracted in the background for the stored text
+UPLOAD_ANALYSIS_BUDGET_CHARS = int(os.getenv("UPLOAD_ANALYSIS_BUDGET_CHARS", "0"))
 
-def load_credits() -> Dict[str, int]:
-    return _load_json(_CREDITS_FILE, {})
+# Simple persistent stores
+_CREDITS_FILE = DATA_DIR / "credits.json"
+_EVENTS_FILE = DATA_DIR / "processed_events.json"
 
-def save_credits(data: Dict[str, int]):
-    _save_json(_CREDITS_FILE, data)
+# Credits ledger (SQLite, WAL); imports the legacy credits.json on first start
+credits_store = CreditsStore(DATA_DIR / "billing.db")
+credits_store.migrate_json(_CREDITS_FILE)
 
-def load_processed_events() -> Dict[str, bool]:
-    return _load_json(_EVENTS_FILE, {})
+# Webhook idempotency (same database, so claims and credit grants commit together)
+processed_events = ProcessedEvents(
+    DATA_DIR / "billing.db",
+    ttl_seconds=float(os.getenv("WEBHOOK_EVENT_TTL_SECONDS", str(30 * 24 * 3600))),
+)
+processed_events.migrate_json(_EVENTS_FILE)
 
-def save_processed_events(data: Dict[str, bool]):
-    _save_json(_EVENTS_FILE, data)
+# Verified webhook events waiting for the background applier (same database again)
+webhook_inbox = WebhookInbox(DATA_DIR / "billing.db", processed_events)
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "500"))
+WEBHOOK_BATCH_LINGER_SECONDS = float(os.getenv("WEBHOOK_BATCH_LINGER_SECONDS", "0.05"))
+WEBHOOK_POLL_SECONDS = float(os.getenv("WEBHOOK_POLL_SECONDS", "2"))
 
-def add_credits(email: str, amount: int):
-    credits = load_credits()
-    credits[email.lower()] = int(credits.get(email.lower(), 0)) + int(amount)
-    save_credits(credits)
+def add_credits(email: str, amount: int) -> int:
+    return credits_store.add(email, amount)
 
 def set_credits(email: str, amount: int):
-    credits = load_credits()
-    credits[email.lower()] = int(amount)
-    save_credits(credits)
+    credits_store.set(email, amount)
 
 @app.get("/")
 async def root():
@@ -119,13 +184,104 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
+    stores = await asyncio.to_thread(_store_stats)
     return {
         "status": "ok",
         "service": "contract-ai-backend",
         "version": "1.0.0",
-        "gemini_configured": bool(os.getenv("GEMINI_API_KEY"))
+        "gemini_configured": bool(os.getenv("GEMINI_API_KEY")),
+        "analysis_cache": get_analysis_cache().stats(),
+        "answer_cache": get_answer_cache().stats(),
+        "retrieval": retrieval_stats(),
+        "model_calls": model_call_stats(),
+        **stores,
     }
 
+def _store_stats() -> Dict[str, Any]:
+    # SQLite queries (and opening similarity.db on first use); run off the event loop
+    similarity = get_similarity_index()
+    return {
+        "similarity_index": similarity.stats() if similarity is not None else None,
+        "uploads": upload_blobs.stats(),
+        "webhooks": webhook_inbox.stats(),
+    }
+
+def _collect_service_stats():
+    """Export the counters behind /health as Prometheus families at scrape time.
+
+    Queries the SQLite stores, so the registry is rendered in a worker thread.
+    """
+    cache = get_analysis_cache().stats()
+    yield "contract_ai_analysis_cache_lookups_total", "counter", "Analysis cache lookups by result", [
+        ({"result": "memory_hit"}, cache["memory_hits"]),
+        ({"result": "disk_hit"}, cache["disk_hits"]),
+        ({"result": "miss"}, cache["misses"]),
+    ]
+    yield "contract_ai_analysis_cache_hit_ratio", "gauge", "Analysis cache hit ratio since start", [
+        ({}, cache["hit_rate"])
+    ]
+    yield "contract_ai_analysis_cache_memory_entries", "gauge", "Analyses held in memory", [
+        ({}, cache["memory_entries"])
+    ]
+    answers = get_answer_cache().stats()
+    yield "contract_ai_answer_cache_lookups_total", "counter", "Question answer cache lookups by result", [
+        ({"result": "memory_hit"}, answers["memory_hits"]),
+        ({"result": "disk_hit"}, answers["disk_hits"]),
+        ({"result": "miss"}, answers["misses"]),
+    ]
+    retrieval = retrieval_stats()
+    yield "contract_ai_retrieval_indexes_cached", "gauge", "Question indexes held in memory", [
+        ({}, retrieval["indexes_cached"])
+    ]
+    yield "contract_ai_retrieval_index_builds_total", "counter", "Question indexes built", [
+        ({}, retrieval["index_builds"])
+    ]
+    yield "contract_ai_retrieval_index_build_seconds_total", "counter", "Time spent building question indexes", [
+        ({}, retrieval["index_build_seconds_total"])
+    ]
+    yield "contract_ai_retrieval_searches_total", "counter", "Passage searches", [({}, retrieval["searches"])]
+    yield "contract_ai_retrieval_search_seconds_total", "counter", "Time spent in passage searches", [
+        ({}, retrieval["search_seconds_total"])
+    ]
+    calls = model_call_stats()
+    yield "contract_ai_model_concurrency_limit", "gauge", "Current adaptive Gemini concurrency limit", [
+        ({}, calls["limit"])
+    ]
+    yield "contract_ai_model_calls_in_flight", "gauge", "Gemini calls in flight", [({}, calls["in_flight"])]
+    yield "contract_ai_model_overloads_total", "counter", "Gemini 429/5xx responses", [({}, calls["overloads"])]
+    yield "contract_ai_model_calls_coalesced_total", "counter", "Calls served by an identical call in flight", [
+        ({}, calls["coalesced"])
+    ]
+    similarity = get_similarity_index()
+    if similarity is not None:
+        yield "contract_ai_similarity_documents", "gauge", "Analyzed contracts in the near-duplicate index", [
+            ({}, similarity.count())
+        ]
+    uploads = upload_blobs.stats()
+    yield "contract_ai_upload_store_bytes", "gauge", "Bytes of uploaded files on disk", [({}, uploads["bytes"])]
+    yield "contract_ai_upload_store_files", "gauge", "Distinct uploaded files on disk", [({}, uploads["files"])]
+    webhooks = webhook_inbox.stats()
+    yield "contract_ai_webhook_inbox_depth", "gauge", "Verified webhook events waiting to be applied", [
+        ({}, webhooks["depth"])
+    ]
+    yield "contract_ai_webhook_inbox_oldest_seconds", "gauge", "Age of the oldest queued webhook event", [
+        ({}, webhooks["oldest_age_seconds"])
+    ]
+    yield "contract_ai_webhook_events_applied_total", "counter", "Webhook events applied by this worker", [
+        ({}, webhooks["applied"])
+    ]
+    yield "contract_ai_upload_jobs_queued", "gauge", "Async upload jobs waiting for a worker", [
+        ({}, upload_jobs.depth())
+    ]
+
+metrics.REGISTRY.add_collector(_collect_service_stats)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics for this worker process"""
+    body = await asyncio.to_thread(metrics.REGISTRY.render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
 def build_static_checkout_link(product_id: str, params: Dict[str, Any]) -> str:
     """Construct a Dodo static payment link for a product with optional params."""
     base = os.getenv("DODO_CHECKOUT_BASE", "https://checkout.dodopayments.com/buy").rstrip("/")
@@ -133,42 +289,215 @@ def build_static_checkout_link(product_id: str, params: Dict[str, Any]) -> str:
     query = urlencode({k: v for (k, v) in params.items() if v not in (None, "")})
     return f"{base}/{pid}" + (f"?{query}" if query else "")
 
-def extract_text_from_pdf(file_path: Path) -> str:
-    """Extract text from PDF file"""
-    text = ""
-    with open(file_path, 'rb') as file:
-        pdf_reader = PyPDF2.PdfReader(file)
-        for page in pdf_reader.pages:
-            page_text = page.extract_text() or ""
-            text += page_text + "\n"
-    return text
+async def save_upload(file: UploadFile, dest: Path) -> Tuple[int, str]:
+    """Stream an upload to ``dest`` in fixed-size chunks.
 
-def extract_text_from_docx(file_path: Path) -> str:
-    """Extract text from DOCX file"""
-    doc = Document(file_path)
-    text = ""
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
+    Returns the byte count and SHA-256 hex digest, computed while writing.
+    Raises 413 (and removes the partial file) once MAX_FILE_SIZE is exceeded.
+    """
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail=f"File too large. Maximum size is {MAX_FILE_SIZE} bytes")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(dest, 'wb') as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise HTTPException(status_code=413, detail=f"File too large. Maximum size is {MAX_FILE_SIZE} bytes")
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    return size, digest.hexdigest()
+
+async def resolve_contract_text(contract_text: Optional[str], contract_id: Optional[str]) -> str:
+    """Return inline contract text, or load it from the store by contract ID."""
+    if contract_text:
+        return contract_text
+    if not contract_id:
+        raise HTTPException(status_code=400, detail="Provide contract_text or contract_id")
+    # Only IDs the store knows about are read from disk
+    if await asyncio.to_thread(contract_store.get, contract_id) is None:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    text = await asyncio.to_thread(contract_store.get_text, contract_id)
+    if text is None:
+        raise HTTPException(status_code=404, detail="Contract not found")
     return text
 
-def extract_text_from_file(file_path: Path) -> str:
-    """Extract text based on file extension"""
-    extension = file_path.suffix.lower()
-    
-    if extension == '.pdf':
-        return extract_text_from_pdf(file_path)
-    elif extension == '.docx':
-        return extract_text_from_docx(file_path)
-    elif extension == '.txt':
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    else:
-        raise ValueError(f"Unsupported file type: {extension}")
+async def resolve_email_issues(request: EmailRequest) -> Optional[List[str]]:
+    """Explicit issues, else (for stored contracts) the analysis' high-severity risks."""
+    if request.issues is not None or not request.contract_id or request.contract_text:
+        return request.issues
+    analysis = await asyncio.to_thread(contract_store.get_analysis, request.contract_id) or {}
+    return [
+        r.get("risk_type") or r.get("description")
+        for r in analysis.get("risks") or []
+        if str(r.get("severity", "")).lower() == "high"
+    ][:5] or None
+
+async def process_upload(
+    file_path: Path, filename: str, saved_as: str, size: int, sha256: str, job: Optional[Job] = None
+) -> Dict[str, Any]:
+    """Extract, analyze and store a saved upload; returns the /upload response body.
+
+    If it fails, the upload's reference to its stored file is released.
+    """
+    try:
+        return await _process_upload(file_path, filename, saved_as, size, sha256, job)
+    except BaseException:
+        await asyncio.to_thread(upload_blobs.release, sha256, file_path.suffix)
+        raise
+
+async def _process_upload(
+    file_path: Path, filename: str, saved_as: str, size: int, sha256: str, job: Optional[Job]
+) -> Dict[str, Any]:
+    # Extract text from file
+    if job:
+        job.enter("extracting")
+    try:
+        with metrics.STAGE_SECONDS.time(endpoint="upload", stage="extract"):
+            if UPLOAD_ANALYSIS_BUDGET_CHARS > 0:
+                extracted_text, text_complete, page_count = await extract_prefix_in_pool(
+                    file_path, UPLOAD_ANALYSIS_BUDGET_CHARS
+                )
+            else:
+                extracted_text, text_complete, page_count = await extract_text_in_pool(file_path), True, None
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error extracting text: {str(e)}")
+    if text_complete:
+        # Otherwise _complete_text records the full document later
+        metrics.DOCUMENT_CHARS.observe(len(extracted_text), extension=file_path.suffix.lower())
+        if page_count is not None:
+            metrics.DOCUMENT_PAGES.observe(page_count)
+
+    # Analyze contract with AI (Gemini)
+    if job:
+        job.enter("analyzing")
+    try:
+        with metrics.STAGE_SECONDS.time(endpoint="upload", stage="analyze"):
+            analysis = await run_model_call(analyze_contract_with_ai, extracted_text)
+    except Exception as e:
+        # Rule-based result so the upload still gets clauses and risks
+        analysis = await asyncio.to_thread(local_analysis, extracted_text, str(e))
+    if not text_complete:
+        analysis["partial"] = {"analyzed_chars": len(extracted_text)}
+
+    if job:
+        job.enter("storing")
+    with metrics.STAGE_SECONDS.time(endpoint="upload", stage="store"):
+        await asyncio.to_thread(
+            contract_store.add, saved_as, filename, size, sha256, extracted_text, analysis
+        )
+    if not text_complete:
+        _spawn(_complete_text(file_path, saved_as))
+
+    return {
+        "message": "Contract uploaded and analyzed successfully",
+        "filename": filename,
+        "saved_as": saved_as,
+        "contract_id": saved_as,
+        "size": size,
+        "sha256": sha256,
+        "extracted_text": extracted_text[:1000] + "..." if len(extracted_text) > 1000 else extracted_text,
+        "text_complete": text_complete,
+        "analysis": analysis
+    }
+
+_background_tasks: Set[asyncio.Task] = set()
+
+def _spawn(coro) -> None:
+    # The loop only keeps weak references to tasks
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def _complete_text(file_path: Path, contract_id: str) -> None:
+    """Replace a budget-limited upload's stored text with the full extraction."""
+    try:
+        text = await extract_text_in_pool(file_path)
+        metrics.DOCUMENT_CHARS.observe(len(text), extension=file_path.suffix.lower())
+        if await asyncio.to_thread(contract_store.get, contract_id) is not None:
+            await asyncio.to_thread(contract_store.set_text, contract_id, text)
+    except Exception as e:
+        print(f"[Upload] Full text extraction for {contract_id} failed: {e}")
+
+async def _run_upload_job(job: Job) -> Dict[str, Any]:
+    return await process_upload(**job.payload, job=job)
+
+# Background processing for /upload?async=true
+upload_jobs = JobQueue(
+    _run_upload_job,
+    concurrency=int(os.getenv("JOB_CONCURRENCY", "4")),
+    max_pending=int(os.getenv("JOB_QUEUE_MAX", "1000")),
+    ttl_seconds=float(os.getenv("JOB_TTL_SECONDS", "3600")),
+)
+
+_sweeper_task: Optional[asyncio.Task] = None
+_webhook_task: Optional[asyncio.Task] = None
+webhook_wakeup = asyncio.Event()
+
+async def _apply_webhooks():
+    # Also polls, to pick up events queued by other workers or left over from
+    # before a restart
+    while True:
+        webhook_wakeup.clear()
+        try:
+            taken = await asyncio.to_thread(webhook_inbox.apply_batch, WEBHOOK_BATCH_SIZE)
+        except Exception as e:
+            print(f"[Dodo] Applying webhook events failed: {e}")
+            taken = 0
+        if taken >= WEBHOOK_BATCH_SIZE:
+            continue
+        try:
+            await asyncio.wait_for(webhook_wakeup.wait(), WEBHOOK_POLL_SECONDS)
+            # Let a burst accumulate so it is applied in one transaction
+            await asyncio.sleep(WEBHOOK_BATCH_LINGER_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+async def _sweep_uploads():
+    while True:
+        try:
+            evicted = await asyncio.to_thread(upload_blobs.sweep)
+            if evicted:
+                print(f"[Uploads] Evicted {evicted} stored files over the age/size quota")
+        except Exception as e:
+            print(f"[Uploads] Sweep failed: {e}")
+        await asyncio.sleep(UPLOAD_SWEEP_INTERVAL_SECONDS)
+
+@app.on_event("startup")
+async def _start_job_workers():
+    global _sweeper_task, _webhook_task
+    upload_jobs.start()
+    if UPLOAD_SWEEP_INTERVAL_SECONDS > 0:
+        _sweeper_task = asyncio.create_task(_sweep_uploads())
+    _webhook_task = asyncio.create_task(_apply_webhooks())
+
+@app.on_event("shutdown")
+async def _stop_job_workers():
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+    if _webhook_task is not None:
+        _webhook_task.cancel()
+        # Whatever is left stays queued and is applied after the next start
+        try:
+            await asyncio.to_thread(webhook_inbox.apply_batch, WEBHOOK_BATCH_SIZE)
+        except Exception as e:
+            print(f"[Dodo] Applying webhook events failed: {e}")
+    await upload_jobs.stop()
 
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), run_async: bool = Query(False, alias="async")):
     """
     Upload and analyze a contract file
+
+    With ``?async=true`` the file is saved and a 202 with a job ID is returned
+    immediately; poll ``/jobs/{job_id}`` for progress and the result.
     """
     try:
         # Validate file
@@ -183,86 +512,117 @@ async def upload_file(file: UploadFile = File(...)):
         
         # Generate unique filename
         unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = UPLOAD_DIR / unique_filename
-        
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        # Extract text from file
-        try:
-            extracted_text = extract_text_from_file(file_path)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error extracting text: {str(e)}")
-        
-        # Analyze contract with AI (Gemini)
-        try:
-            analysis = analyze_contract_with_ai(extracted_text)
-        except Exception as e:
-            analysis = {
-                "summary": f"AI analysis failed: {str(e)}",
-                "key_clauses": [],
-                "risks": [],
-                "risk_score": 50
-            }
         
-        return JSONResponse(
-            status_code=200,
-            content={
-                "message": "Contract uploaded and analyzed successfully",
-                "filename": file.filename,
-                "saved_as": unique_filename,
-                "size": len(content),
-                "extracted_text": extracted_text[:1000] + "..." if len(extracted_text) > 1000 else extracted_text,
-                "analysis": analysis
-            }
-        )
+        # Save file (identical content is stored only once)
+        temp_path = upload_blobs.temp_path(file_extension)
+        with metrics.STAGE_SECONDS.time(endpoint="upload", stage="save"):
+            size, sha256 = await save_upload(file, temp_path)
+            file_path = await asyncio.to_thread(upload_blobs.put, temp_path, sha256, file_extension)
+        metrics.UPLOAD_BYTES.observe(size, extension=file_extension)
+        payload = {
+            "file_path": file_path,
+            "filename": file.filename,
+            "saved_as": unique_filename,
+            "size": size,
+            "sha256": sha256,
+        }
+
+        if run_async:
+            try:
+                job = upload_jobs.submit(payload)
+            except QueueFullError:
+                await asyncio.to_thread(upload_blobs.release, sha256, file_extension)
+                raise HTTPException(status_code=503, detail="Too many pending uploads, retry later")
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "message": "Contract uploaded; analysis queued",
+                    "job_id": job.id,
+                    "status_url": f"/jobs/{job.id}",
+                    "filename": file.filename,
+                    "saved_as": unique_filename,
+                    "contract_id": unique_filename,
+                    "size": size,
+                    "sha256": sha256,
+                },
+            )
+
+        return JSONResponse(status_code=200, content=await process_upload(**payload))
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status, per-stage timings and (when finished) the result of an upload job
+    """
+    job = upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
 @app.get("/contracts")
 async def list_contracts():
     """
     List all uploaded contract files
     """
     try:
-        files = []
-        for file_path in UPLOAD_DIR.iterdir():
-            if file_path.is_file():
-                stat = file_path.stat()
-                files.append({
-                    "filename": file_path.name,
-                    "size": stat.st_size,
-                    "created_at": stat.st_ctime,
-                    "extension": file_path.suffix
-                })
+        files = [
+            {
+                "filename": record["contract_id"],
+                "contract_id": record["contract_id"],
+                "original_filename": record["filename"],
+                "size": record["size"],
+                "created_at": record["created_at"],
+                "extension": record["extension"],
+                "analyzed": bool(record["analyzed"]),
+            }
+            for record in await asyncio.to_thread(contract_store.list)
+        ]
         
         return {"contracts": files, "count": len(files)}
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing contracts: {str(e)}")
 
+@app.get("/contracts/{contract_id}")
+async def get_contract(contract_id: str, include_text: bool = False):
+    """
+    Get stored metadata and analysis for a contract (optionally its full text)
+    """
+    record = await asyncio.to_thread(contract_store.get, contract_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    if include_text:
+        record["extracted_text"] = await asyncio.to_thread(contract_store.get_text, contract_id)
+    return record
+
 @app.delete("/contracts/{filename}")
 async def delete_contract(filename: str):
     """
     Delete a specific contract file
     """
     try:
-        file_path = UPLOAD_DIR / filename
-        
-        if not file_path.exists():
+        contract_id = Path(filename).name
+        record = await asyncio.to_thread(contract_store.get, contract_id)
+        if record is None:
             raise HTTPException(status_code=404, detail="Contract not found")
         
-        file_path.unlink()
+        text = await asyncio.to_thread(contract_store.get_text, contract_id)
+        deleted = await asyncio.to_thread(contract_store.delete, contract_id)
+        if deleted and record["sha256"]:
+            await asyncio.to_thread(upload_blobs.release, record["sha256"], record["extension"])
+        if deleted and text:
+            # Otherwise new uploads of the same template keep reusing its analysis
+            await asyncio.to_thread(forget_contract_analysis, text)
         
         return {"message": f"Contract {filename} deleted successfully"}
     
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Contract not found")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting contract: {str(e)}")
 
@@ -276,7 +636,9 @@ async def analyze_contract(request: dict):
         if not contract_text:
             raise HTTPException(status_code=400, detail="No contract text provided")
         
-        analysis = analyze_contract_with_ai(contract_text)
+        metrics.INPUT_CHARS.observe(len(contract_text), endpoint="analyze")
+        with metrics.STAGE_SECONDS.time(endpoint="analyze", stage="analyze"):
+            analysis = await run_model_call(analyze_contract_with_ai, contract_text)
         return analysis
     
     except HTTPException:
@@ -289,12 +651,19 @@ async def generate_email(request: EmailRequest):
     """
     Generate negotiation email based on contract
     """
+    with metrics.STAGE_SECONDS.time(endpoint="generate_email", stage="resolve"):
+        contract_text = await resolve_contract_text(request.contract_text, request.contract_id)
+        issues = await resolve_email_issues(request)
+    metrics.INPUT_CHARS.observe(len(contract_text), endpoint="generate_email")
     try:
-        email = generate_negotiation_email(
-            contract_text=request.contract_text,
-            tone=request.tone,
-            issues=request.issues
-        )
+        with metrics.STAGE_SECONDS.time(endpoint="generate_email", stage="generate"):
+            email = await run_model_call(
+                generate_negotiation_email,
+                contract_text=contract_text,
+                tone=request.tone,
+                issues=issues
+            )
+        metrics.OUTPUT_CHARS.observe(len(email.get("body") or ""), endpoint="generate_email")
         return email
     
     except Exception as e:
@@ -305,16 +674,132 @@ async def ask_question(request: QuestionRequest):
     """
     Answer questions about the contract
     """
+    with metrics.STAGE_SECONDS.time(endpoint="ask_question", stage="resolve"):
+        contract_text = await resolve_contract_text(request.contract_text, request.contract_id)
+    metrics.INPUT_CHARS.observe(len(contract_text), endpoint="ask_question")
     try:
-        answer = answer_contract_question(
-            question=request.question,
-            contract_text=request.contract_text
-        )
+        with metrics.STAGE_SECONDS.time(endpoint="ask_question", stage="answer"):
+            answer = await run_model_call(
+                answer_contract_question,
+                question=request.question,
+                contract_text=contract_text
+            )
+        metrics.OUTPUT_CHARS.observe(len(answer), endpoint="ask_question")
         return {"question": request.question, "answer": answer}
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Question answering failed: {str(e)}")
 
+@app.post("/ask-questions")
+async def ask_questions(request: QuestionsRequest):
+    """
+    Answer several questions about one contract with a single model call
+    """
+    questions = [q.strip() for q in request.questions if q and q.strip()]
+    if not questions:
+        raise HTTPException(status_code=400, detail="No questions provided")
+    if len(questions) > QUESTION_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {QUESTION_BATCH_MAX} questions per request")
+    with metrics.STAGE_SECONDS.time(endpoint="ask_questions", stage="resolve"):
+        contract_text = await resolve_contract_text(request.contract_text, request.contract_id)
+    metrics.INPUT_CHARS.observe(len(contract_text), endpoint="ask_questions")
+    try:
+        with metrics.STAGE_SECONDS.time(endpoint="ask_questions", stage="answer"):
+            answers = await run_model_call(answer_contract_questions, questions, contract_text)
+        metrics.OUTPUT_CHARS.observe(sum(len(a["answer"]) for a in answers), endpoint="ask_questions")
+        return {"answers": answers}
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Question answering failed: {str(e)}")
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# SSE event names for streamed analysis pieces
+_ANALYSIS_EVENTS = {"summary": "summary", "key_clauses": "clause", "risks": "risk", "risk_score": "risk_score"}
+
+@app.post("/analyze/stream")
+async def analyze_contract_stream(request: dict):
+    """
+    Stream a contract analysis as Server-Sent Events.
+
+    Emits ``clause`` and ``risk`` events as each entry completes in the model
+    output, ``summary`` and ``risk_score`` when ready, then ``done`` with the
+    full analysis (the same payload /analyze returns), or ``error``.
+    """
+    contract_text = await resolve_contract_text(request.get("contract_text"), request.get("contract_id"))
+
+    async def events():
+        try:
+            async for field, value in stream_model_call(stream_contract_analysis, contract_text):
+                if field == "analysis":
+                    yield sse_event("done", value)
+                else:
+                    yield sse_event(_ANALYSIS_EVENTS[field], value)
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Analysis failed: {str(e)}"})
+
+    return sse_response(events())
+
+@app.post("/generate-email/stream")
+async def generate_email_stream(request: EmailRequest):
+    """
+    Stream a negotiation email as Server-Sent Events.
+
+    Emits ``delta`` events ({"text": ...}) while the model writes, then a
+    ``done`` event with the same payload as /generate-email (or ``error``).
+    """
+    contract_text = await resolve_contract_text(request.contract_text, request.contract_id)
+    issues = await resolve_email_issues(request)
+
+    async def events():
+        parts = []
+        try:
+            async for delta in stream_model_call(
+                stream_negotiation_email, contract_text=contract_text, tone=request.tone, issues=issues
+            ):
+                parts.append(delta)
+                yield sse_event("delta", {"text": delta})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Email generation failed: {str(e)}"})
+            return
+        yield sse_event("done", parse_streamed_email("".join(parts), request.tone))
+
+    return sse_response(events())
+
+@app.post("/ask-question/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Stream the answer to a contract question as Server-Sent Events.
+
+    Emits ``delta`` events ({"text": ...}) while the model writes, then a
+    ``done`` event with the same payload as /ask-question (or ``error``).
+    """
+    contract_text = await resolve_contract_text(request.contract_text, request.contract_id)
+
+    async def events():
+        parts = []
+        try:
+            async for delta in stream_model_call(
+                stream_contract_answer, question=request.question, contract_text=contract_text
+            ):
+                parts.append(delta)
+                yield sse_event("delta", {"text": delta})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Question answering failed: {str(e)}"})
+            return
+        yield sse_event("done", {"question": request.question, "answer": "".join(parts)})
+
+    return sse_response(events())
+
 def _verify_dodo_signature(secret: str, body: bytes, webhook_headers: Dict[str, str]) -> bool:
     """Verify Dodo webhook signature using Standard Webhooks format.
     
@@ -360,77 +845,33 @@ async def dodo_webhook(request: Request):
     if not _verify_dodo_signature(secret, raw, webhook_headers):
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    # Signature valid; parse JSON and perform routing
+    # Signature valid; parse JSON and queue the event
     try:
         payload = await request.json()
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
-    event_id = payload.get("id") or payload.get("event_id") or ""
-    event_type = payload.get("type") or payload.get("event") or ""
-    data = payload.get("data") or {}
-
-    # Idempotency: skip if already processed
-    processed = load_processed_events()
-    if event_id and processed.get(event_id):
-        return {"ok": True, "duplicate": True}
-
-    # Extract identifiers—adjust based on Dodo payload schema
-    customer = data.get("customer") or {}
-    email = (customer.get("email") or data.get("email") or "").strip()
-    # Try various fields to determine plan/name
-    plan_name = (
-        data.get("plan")
-        or (data.get("product") or {}).get("name")
-        or (data.get("price") or {}).get("name")
-        or (data.get("line_item") or {}).get("name")
-        or ""
-    )
-
-    # Map plan to credits
-    def credits_for_plan(name: str) -> int:
-        n = (name or "").lower()
-        if "pro" in n:
-            return 10
-        if "free" in n:
-            return 1
-        # Fallback by amount if present
-        amount = data.get("amount") or (data.get("price") or {}).get("amount")
-        if str(amount) in {"1500", "15", "15.00"}:
-            return 10
-        return 0
-
-    granted = 0
+    # Map the event before queueing it, so a payload the applier cannot read
+    # is rejected here rather than acknowledged
     try:
-        if event_type in {"payment.completed", "checkout.completed"}:
-            if not email:
-                print("[Dodo] Missing customer email in payload; cannot grant credits")
-            else:
-                granted = credits_for_plan(plan_name)
-                if granted > 0:
-                    add_credits(email, granted)
-        elif event_type in {"subscription.activated", "subscription.renewed"}:
-            # Example: set base monthly credits for subscription
-            if email:
-                base = credits_for_plan(plan_name)
-                if base > 0:
-                    add_credits(email, base)
-        elif event_type in {"subscription.canceled"}:
-            # No credit change on cancel in this simple example
-            pass
-    finally:
-        if event_id:
-            processed[event_id] = True
-            save_processed_events(processed)
-
-    print("[Dodo] Webhook received:", event_type, "plan=", plan_name, "email=", email, "granted=", granted)
-    return {"ok": True, "granted": granted}
+        event_id = payload.get("id") or payload.get("event_id") or ""
+        event_type = payload.get("type") or payload.get("event") or ""
+        grant = dodo_credit_grant(payload)
+    except (AttributeError, TypeError):
+        raise HTTPException(status_code=400, detail="Unexpected webhook payload shape")
+
+    # Durably recorded before acknowledging; credits are granted by the
+    # background applier, batched with other events, so the response only
+    # reports what this event will grant once applied
+    if not await asyncio.to_thread(webhook_inbox.record, event_id, event_type, raw.decode("utf-8")):
+        return {"ok": True, "duplicate": True}
+    webhook_wakeup.set()
+    return {"ok": True, "queued": True, "pending_grant": grant.granted}
 
 @app.get("/credits/{email}")
 async def get_credits(email: str):
     """Get current credits for an email (temporary store)."""
-    credits = load_credits()
-    return {"email": email.lower(), "credits": int(credits.get(email.lower(), 0))}
+    return {"email": email.lower(), "credits": await asyncio.to_thread(credits_store.get, email)}
 
 @app.get("/payments/pro/link")
 async def get_pro_payment_link(
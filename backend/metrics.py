@@ -0,0 +1,232 @@
+"""
+In-process Prometheus metrics (text exposition format, no client library needed)
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# (labels, value) pairs reported by a collector callback
+Sample = Tuple[Dict[str, str], float]
+# (name, type, help, samples) families reported by a collector callback
+Family = Tuple[str, str, str, List[Sample]]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+CHARS_BUCKETS = (100, 1000, 4000, 12000, 50000, 100000, 250000, 500000, 1000000, 5000000)
+PAGES_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+BYTES_BUCKETS = (1024, 16384, 131072, 1048576, 4194304, 16777216, 52428800)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(k))} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][slot] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(counts), total) for k, (counts, total) in self._series.items()]
+        lines = []
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Holds metrics and collector callbacks; ``render`` produces the /metrics body.
+
+    Collectors are called at scrape time and return ``Family`` tuples, which
+    is how counters kept elsewhere (cache, retrieval, limiter stats) are
+    exported without touching their hot paths.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"[Metrics] Collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "contract_ai_stage_seconds", "Time spent in each stage of an API request", ("endpoint", "stage")
+)
+MODEL_CALL_SECONDS = REGISTRY.histogram(
+    "contract_ai_model_call_seconds",
+    "Upstream Gemini call latency, including overload retries",
+    ("operation", "outcome"),
+)
+MODEL_FIRST_DELTA_SECONDS = REGISTRY.histogram(
+    "contract_ai_model_first_delta_seconds", "Time to the first streamed Gemini delta", ("operation",)
+)
+MODEL_PROMPT_CHARS = REGISTRY.histogram(
+    "contract_ai_model_prompt_chars", "Prompt size sent to Gemini", ("operation",), CHARS_BUCKETS
+)
+MODEL_RESPONSE_CHARS = REGISTRY.histogram(
+    "contract_ai_model_response_chars", "Response size returned by Gemini", ("operation",), CHARS_BUCKETS
+)
+JSON_PARSE_FAILURES = REGISTRY.counter(
+    "contract_ai_json_parse_failures_total", "Model responses that were not valid JSON", ("operation",)
+)
+UPLOAD_BYTES = REGISTRY.histogram(
+    "contract_ai_upload_bytes", "Size of uploaded files", ("extension",), BYTES_BUCKETS
+)
+DOCUMENT_CHARS = REGISTRY.histogram(
+    "contract_ai_document_chars", "Characters of text extracted from uploads", ("extension",), CHARS_BUCKETS
+)
+DOCUMENT_PAGES = REGISTRY.histogram(
+    "contract_ai_document_pages", "Pages per extracted PDF", (), PAGES_BUCKETS
+)
+PDF_PAGE_SECONDS = REGISTRY.histogram(
+    "contract_ai_pdf_page_seconds", "Extraction time per PDF page (ok or error)", ("outcome",)
+)
+INPUT_CHARS = REGISTRY.histogram(
+    "contract_ai_input_chars", "Contract text size per request", ("endpoint",), CHARS_BUCKETS
+)
+OUTPUT_CHARS = REGISTRY.histogram(
+    "contract_ai_output_chars", "Generated text size per request", ("endpoint",), CHARS_BUCKETS
+)
+
+SIMILARITY_LOOKUPS = REGISTRY.counter(
+    "contract_ai_similarity_lookups_total",
+    "Near-duplicate lookups before analysis (reused, miss or too_different)",
+    ("result",),
+)
+SIMILARITY_REANALYZED_FRACTION = REGISTRY.histogram(
+    "contract_ai_similarity_reanalyzed_fraction",
+    "Share of a near-duplicate's text sent to Gemini",
+    (),
+    (0.01, 0.05, 0.1, 0.2, 0.3, 0.5),
+)
@@ -0,0 +1,190 @@
+"""
+Lexical (BM25) passage retrieval so questions are answered from relevant excerpts
+"""
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Tuple, Any
+
+from backend.cache import content_key
+
+PASSAGE_CHARS = int(os.getenv("RETRIEVAL_PASSAGE_CHARS", "1000"))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "6"))
+INDEX_CACHE_SIZE = int(os.getenv("RETRIEVAL_INDEX_CACHE_SIZE", "64"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.;:])\s+")
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ions", "ion", "ments", "ment", "edly", "ed", "es", "s")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in is it its may "
+    "of on or shall should that the their there this to was what when where which who "
+    "will with would you your we our us any all not no".split()
+)
+
+
+def _stem(token: str) -> str:
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[: -len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def split_passages(text: str, size: int = PASSAGE_CHARS) -> List[str]:
+    """Pack paragraphs into passages of roughly ``size`` characters.
+
+    Paragraphs longer than ``size`` are split at sentence boundaries (and hard-cut
+    if a single sentence is still too long).
+    """
+    units: List[str] = []
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        if not para:
+            continue
+        if len(para) <= size:
+            units.append(para)
+            continue
+        for sentence in _SENTENCE_RE.split(para):
+            units.extend(sentence[i:i + size] for i in range(0, len(sentence), size))
+
+    passages: List[str] = []
+    current: List[str] = []
+    length = 0
+    for unit in units:
+        if current and length + len(unit) > size:
+            passages.append("\n".join(current))
+            current, length = [], 0
+        current.append(unit)
+        length += len(unit) + 1
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+
+class PassageIndex:
+    """Okapi BM25 over a fixed list of passages, backed by an inverted index."""
+
+    def __init__(self, passages: List[str], k1: float = 1.5, b: float = 0.75):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+        for doc_id, passage in enumerate(passages):
+            counts = Counter(tokenize(passage))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((doc_id, tf))
+        self._avgdl = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+    def search(self, query: str, k: int = RETRIEVAL_TOP_K) -> List[Tuple[int, float]]:
+        """Return up to ``k`` (passage index, score) pairs, best first."""
+        n = len(self.passages)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = 1 - self.b + self.b * (self._lengths[doc_id] / self._avgdl if self._avgdl else 1)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class _IndexCache:
+    """LRU of per-contract indexes plus build/search timing counters."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._indexes: "OrderedDict[str, PassageIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.searches = 0
+        self.search_seconds = 0.0
+
+    def get(self, text: str) -> PassageIndex:
+        key = content_key(text, "bm25", str(PASSAGE_CHARS))
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        started = time.perf_counter()
+        index = PassageIndex(split_passages(text))
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.builds += 1
+            self.build_seconds += elapsed
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def record_search(self, seconds: float) -> None:
+        with self._lock:
+            self.searches += 1
+            self.search_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "indexes_cached": len(self._indexes),
+                "index_builds": self.builds,
+                "index_build_seconds_total": round(self.build_seconds, 6),
+                "searches": self.searches,
+                "search_seconds_total": round(self.search_seconds, 6),
+            }
+
+
+_index_cache = _IndexCache(INDEX_CACHE_SIZE)
+
+
+def get_index(contract_text: str) -> PassageIndex:
+    """Build (or reuse) the passage index for a contract."""
+    return _index_cache.get(contract_text)
+
+
+def retrieve_passages(contract_text: str, query: str, k: int = RETRIEVAL_TOP_K) -> List[str]:
+    """Top-``k`` passages for ``query``, returned in document order.
+
+    Falls back to the opening passages when nothing in the query matches.
+    """
+    index = get_index(contract_text)
+    started = time.perf_counter()
+    hits = index.search(query, k)
+    _index_cache.record_search(time.perf_counter() - started)
+    ids = sorted(doc_id for doc_id, _ in hits) or list(range(min(k, len(index.passages))))
+    return [index.passages[i] for i in ids]
+
+
+def retrieve_passages_for(contract_text: str, queries: List[str], k: int = RETRIEVAL_TOP_K, limit: int = 0) -> List[str]:
+    """Union of the top-``k`` passages of several queries, in document order.
+
+    With ``limit``, passages are taken rank by rank across the queries until
+    ``limit`` are chosen, so every query keeps its best matches.
+    """
+    index = get_index(contract_text)
+    ranked = []
+    for query in queries:
+        started = time.perf_counter()
+        hits = index.search(query, k)
+        _index_cache.record_search(time.perf_counter() - started)
+        ranked.append([doc_id for doc_id, _ in hits])
+    chosen: List[int] = []
+    for rank in range(k):
+        for hits in ranked:
+            if rank < len(hits) and hits[rank] not in chosen and not (limit and len(chosen) >= limit):
+                chosen.append(hits[rank])
+    ids = sorted(chosen) or list(range(min(k, len(index.passages))))
+    return [index.passages[i] for i in ids]
+
+def retrieval_stats() -> Dict[str, Any]:
+    return _index_cache.stats()
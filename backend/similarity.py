@@ -0,0 +1,245 @@
+"""
+Near-duplicate contract index: MinHash signatures over word shingles, LSH bands in SQLite
+"""
+import hashlib
+import json
+import os
+import re
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from backend.cache import normalize_text
+from backend.clauses import Section, segment
+from backend.db import connect
+
+SHINGLE_WORDS = 5
+NUM_HASHES = 128  # must be a power of two (hash bins are picked by the low bits)
+LSH_BANDS = 16
+LSH_ROWS = NUM_HASHES // LSH_BANDS
+MAX_CANDIDATES = 32
+
+_BIN_BITS = NUM_HASHES.bit_length() - 1
+_EMPTY = 0xFFFFFFFF
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    sections TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_created_at ON documents (created_at);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc_key TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, doc_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bands_doc_key ON bands (doc_key);
+"""
+
+
+def minhash(text: str) -> Optional[List[int]]:
+    """One-permutation MinHash of the word 5-gram set of ``text``.
+
+    Each shingle is hashed once (CRC-32); the low bits pick one of NUM_HASHES
+    bins and the bin keeps its minimum. Empty bins borrow from the next filled
+    bin so two signatures still agree with probability equal to the Jaccard
+    similarity. Returns None for texts too short to fill a signature.
+    """
+    words = _WORD_RE.findall(text.lower())
+    shingles = {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+    if len(shingles) < NUM_HASHES:
+        return None
+    mask = NUM_HASHES - 1
+    bins = [_EMPTY] * NUM_HASHES
+    for h in shingles:
+        b = h & mask
+        v = h >> _BIN_BITS
+        if v < bins[b]:
+            bins[b] = v
+    for b in range(NUM_HASHES):
+        if bins[b] == _EMPTY:
+            step = 1
+            while bins[(b + step) & mask] == _EMPTY:
+                step += 1
+            bins[b] = bins[(b + step) & mask]
+    return bins
+
+
+def jaccard_estimate(a: Sequence[int], b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_HASHES
+
+
+def _band_buckets(signature: Sequence[int]) -> List[Tuple[int, int]]:
+    return [
+        (band, zlib.crc32(array("I", signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]).tobytes()))
+        for band in range(LSH_BANDS)
+    ]
+
+
+def section_hash(section: Section) -> str:
+    return hashlib.sha1(normalize_text(section.text).lower().encode("utf-8")).hexdigest()[:16]
+
+
+class Fingerprint(NamedTuple):
+    signature: List[int]
+    sections: List[Section]
+    hashes: List[str]
+
+
+def fingerprint(text: str) -> Optional[Fingerprint]:
+    signature = minhash(text)
+    if signature is None:
+        return None
+    sections = segment(text)
+    return Fingerprint(signature, sections, [section_hash(s) for s in sections])
+
+
+class Match(NamedTuple):
+    doc_key: str
+    similarity: float
+    sections: List[Tuple[str, str]]  # (section hash, label) in document order
+    analysis: Dict[str, Any]
+
+
+class SimilarityIndex:
+    """Analyzed contracts indexed for near-duplicate lookup.
+
+    ``scope`` (model and prompt version) keeps analyses from an older prompt
+    from being reused. The index keeps at most ``max_entries`` documents,
+    dropping the oldest first.
+    """
+
+    def __init__(self, db_path: Path, threshold: float = 0.8, max_entries: int = 50000):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._adds_since_prune = 0
+        connect(db_path).executescript(_SCHEMA)
+
+    def _db(self):
+        return connect(self.db_path)
+
+    def add(self, doc_key: str, scope: str, fp: Fingerprint, analysis: Dict[str, Any]) -> None:
+        sections = [[h, s.label] for h, s in zip(fp.hashes, fp.sections)]
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO documents (doc_key, scope, signature, sections, analysis, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    doc_key,
+                    scope,
+                    array("I", fp.signature).tobytes(),
+                    json.dumps(sections),
+                    json.dumps(analysis, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            db.executemany(
+                "INSERT OR IGNORE INTO bands (band, bucket, doc_key) VALUES (?, ?, ?)",
+                [(band, bucket, doc_key) for band, bucket in _band_buckets(fp.signature)],
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self._adds_since_prune += 1
+        if self._adds_since_prune >= 100:
+            self._adds_since_prune = 0
+            self.prune()
+
+    def nearest(self, scope: str, signature: Sequence[int]) -> Optional[Match]:
+        """Most similar indexed document at or above the threshold, if any."""
+        buckets = _band_buckets(signature)
+        where = " OR ".join(["(band = ? AND bucket = ?)"] * len(buckets))
+        db = self._db()
+        rows = db.execute(
+            f"SELECT doc_key, COUNT(*) AS hits FROM bands WHERE {where} "
+            "GROUP BY doc_key ORDER BY hits DESC LIMIT ?",
+            [v for pair in buckets for v in pair] + [MAX_CANDIDATES],
+        ).fetchall()
+        best: Optional[Tuple[float, str]] = None
+        for row in rows:
+            doc = db.execute(
+                "SELECT signature FROM documents WHERE doc_key = ? AND scope = ?", (row["doc_key"], scope)
+            ).fetchone()
+            if doc is None:
+                continue
+            score = jaccard_estimate(signature, array("I", doc["signature"]))
+            if score >= self.threshold and (best is None or score > best[0]):
+                best = (score, row["doc_key"])
+        if best is None:
+            return None
+        doc = db.execute("SELECT sections, analysis FROM documents WHERE doc_key = ?", (best[1],)).fetchone()
+        if doc is None:
+            return None
+        sections = [(h, label) for h, label in json.loads(doc["sections"])]
+        return Match(best[1], best[0], sections, json.loads(doc["analysis"]))
+
+    def remove(self, doc_key: str) -> bool:
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM bands WHERE doc_key = ?", (doc_key,))
+            cur = db.execute("DELETE FROM documents WHERE doc_key = ?", (doc_key,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return cur.rowcount > 0
+
+    def prune(self) -> int:
+        """Drop the oldest documents beyond ``max_entries``; returns how many were removed."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            stale = [
+                row["doc_key"]
+                for row in db.execute(
+                    "SELECT doc_key FROM documents ORDER BY created_at DESC LIMIT -1 OFFSET ?", (self.max_entries,)
+                )
+            ]
+            for doc_key in stale:
+                db.execute("DELETE FROM bands WHERE doc_key = ?", (doc_key,))
+                db.execute("DELETE FROM documents WHERE doc_key = ?", (doc_key,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return len(stale)
+
+    def count(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"documents": self.count(), "threshold": self.threshold, "max_entries": self.max_entries}
+
+
+_index: Optional[SimilarityIndex] = None
+
+
+def get_similarity_index() -> Optional[SimilarityIndex]:
+    """Process-wide index under APP_DATA_DIR/data/similarity.db, or None when SIMILARITY_INDEX is off."""
+    global _index
+    if os.getenv("SIMILARITY_INDEX", "true").lower() in {"0", "false", "no"}:
+        return None
+    if _index is None:
+        data_dir = Path(os.getenv("APP_DATA_DIR", "/tmp")).resolve() / "data"
+        _index = SimilarityIndex(
+            data_dir / "similarity.db",
+            threshold=float(os.getenv("SIMILARITY_THRESHOLD", "0.8")),
+            max_entries=int(os.getenv("SIMILARITY_MAX_ENTRIES", "50000")),
+        )
+    return _index
@@ -0,0 +1,169 @@
+"""
+Persistent contract store: extracted text and analysis addressed by contract ID
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from backend.blobs import file_sha256
+from backend.db import connect
+
+if TYPE_CHECKING:
+    from backend.blobs import BlobStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contracts (
+    contract_id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT,
+    created_at REAL NOT NULL,
+    text_chars INTEGER,
+    analysis TEXT
+);
+CREATE INDEX IF NOT EXISTS contracts_created_at ON contracts (created_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ContractStore:
+    """Metadata and analyses live in SQLite; extracted text is one file per contract.
+
+    The contract ID is the ``saved_as`` name returned by ``/upload``; the
+    uploaded file itself is kept in the blob store under ``sha256``.
+    """
+
+    def __init__(self, db_path: Path, text_dir: Path):
+        self.db_path = db_path
+        self.text_dir = text_dir
+        text_dir.mkdir(parents=True, exist_ok=True)
+        connect(db_path).executescript(_SCHEMA)
+
+    def _db(self):
+        return connect(self.db_path)
+
+    def _text_path(self, contract_id: str) -> Path:
+        # IDs come from clients; anything but a plain file name could escape text_dir
+        if contract_id in {"", ".", ".."} or Path(contract_id).name != contract_id:
+            raise ValueError(f"Invalid contract ID: {contract_id!r}")
+        return self.text_dir / f"{contract_id}.txt"
+
+    def add(
+        self,
+        contract_id: str,
+        filename: str,
+        size: int,
+        sha256: Optional[str] = None,
+        text: Optional[str] = None,
+        analysis: Optional[Dict[str, Any]] = None,
+        created_at: Optional[float] = None,
+    ) -> None:
+        if text is not None:
+            self.set_text(contract_id, text)
+        self._db().execute(
+            "INSERT OR REPLACE INTO contracts (contract_id, filename, extension, size, sha256, created_at, text_chars, analysis) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                contract_id,
+                filename,
+                Path(contract_id).suffix.lower(),
+                size,
+                sha256,
+                created_at if created_at is not None else time.time(),
+                len(text) if text is not None else None,
+                json.dumps(analysis, ensure_ascii=False) if analysis is not None else None,
+            ),
+        )
+
+    def set_text(self, contract_id: str, text: str) -> None:
+        path = self._text_path(contract_id)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        self._db().execute("UPDATE contracts SET text_chars = ? WHERE contract_id = ?", (len(text), contract_id))
+
+    def get(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db().execute("SELECT * FROM contracts WHERE contract_id = ?", (contract_id,)).fetchone()
+        return self._row_to_dict(row) if row is not None else None
+
+    def get_text(self, contract_id: str) -> Optional[str]:
+        try:
+            with open(self._text_path(contract_id), "r", encoding="utf-8") as f:
+                return f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def get_analysis(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db().execute("SELECT analysis FROM contracts WHERE contract_id = ?", (contract_id,)).fetchone()
+        if row is None or row["analysis"] is None:
+            return None
+        return json.loads(row["analysis"])
+
+    def list(self) -> List[Dict[str, Any]]:
+        rows = self._db().execute(
+            "SELECT contract_id, filename, extension, size, sha256, created_at, text_chars, analysis IS NOT NULL AS analyzed "
+            "FROM contracts ORDER BY created_at DESC"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete(self, contract_id: str) -> bool:
+        cur = self._db().execute("DELETE FROM contracts WHERE contract_id = ?", (contract_id,))
+        self._text_path(contract_id).unlink(missing_ok=True)
+        return cur.rowcount > 0
+
+    def backfill(self, upload_dir: Path, blobs: "BlobStore") -> int:
+        """One-time move of files from the old flat upload layout into ``blobs``, indexing any not yet recorded.
+
+        Guarded by a flag in the database, so only one worker migrates. Files
+        are hashed before taking the write lock and copied into ``blobs``
+        (which must share this database) inside it; the originals are removed
+        once the migration commits. Files that disappear meanwhile are skipped.
+        """
+        db = self._db()
+        if db.execute("SELECT value FROM meta WHERE key = 'uploads_backfilled'").fetchone():
+            return 0
+        found = []
+        for file_path in upload_dir.iterdir():
+            try:
+                if file_path.is_file():
+                    found.append((file_path, file_path.stat(), file_sha256(file_path)))
+            except FileNotFoundError:
+                continue
+        added = 0
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if db.execute("SELECT value FROM meta WHERE key = 'uploads_backfilled'").fetchone():
+                db.execute("COMMIT")
+                return 0
+            for file_path, stat, sha256 in found:
+                try:
+                    blobs.put_in(db, file_path, sha256, file_path.suffix, copy=True)
+                except FileNotFoundError:
+                    continue
+                if self.get(file_path.name) is None:
+                    self.add(file_path.name, file_path.name, stat.st_size, sha256, created_at=stat.st_ctime)
+                    added += 1
+                else:
+                    db.execute("UPDATE contracts SET sha256 = ? WHERE contract_id = ?", (sha256, file_path.name))
+            db.execute("INSERT INTO meta (key, value) VALUES ('uploads_backfilled', ?)", (str(time.time()),))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        for file_path, _, _ in found:
+            file_path.unlink(missing_ok=True)
+        return added
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict[str, Any]:
+        record = dict(row)
+        analysis = record.pop("analysis", None)
+        record["analysis"] = json.loads(analysis) if analysis else None
+        return record
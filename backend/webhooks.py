@@ -0,0 +1,174 @@
+"""
+Durable webhook inbox: events are acknowledged on receipt and applied to credits in batches
+"""
+import json
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+from backend.credits import CreditsStore
+from backend.db import connect
+from backend.events import ProcessedEvents
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS webhook_inbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT UNIQUE,
+    event_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    received_at REAL NOT NULL
+);
+"""
+
+
+class Grant(NamedTuple):
+    email: str
+    plan: str
+    credits: int  # added to the balance
+    granted: int  # reported to the sender (one-off purchases only)
+
+
+def dodo_credit_grant(payload: Dict[str, Any]) -> Grant:
+    """Map a Dodo event to the credits it grants."""
+    event_type = payload.get("type") or payload.get("event") or ""
+    data = payload.get("data") or {}
+
+    # Extract identifiers—adjust based on Dodo payload schema
+    customer = data.get("customer") or {}
+    email = (customer.get("email") or data.get("email") or "").strip()
+    # Try various fields to determine plan/name
+    plan_name = (
+        data.get("plan")
+        or (data.get("product") or {}).get("name")
+        or (data.get("price") or {}).get("name")
+        or (data.get("line_item") or {}).get("name")
+        or ""
+    )
+
+    # Map plan to credits
+    def credits_for_plan(name: str) -> int:
+        n = (name or "").lower()
+        if "pro" in n:
+            return 10
+        if "free" in n:
+            return 1
+        # Fallback by amount if present
+        amount = data.get("amount") or (data.get("price") or {}).get("amount")
+        if str(amount) in {"1500", "15", "15.00"}:
+            return 10
+        return 0
+
+    granted = 0
+    credit_amount = 0
+    if event_type in {"payment.completed", "checkout.completed"}:
+        if email:
+            granted = credit_amount = credits_for_plan(plan_name)
+    elif event_type in {"subscription.activated", "subscription.renewed"}:
+        # Example: set base monthly credits for subscription
+        if email:
+            credit_amount = credits_for_plan(plan_name)
+    elif event_type in {"subscription.canceled"}:
+        # No credit change on cancel in this simple example
+        pass
+    return Grant(email, plan_name, credit_amount, granted)
+
+
+class WebhookInbox:
+    """Verified webhook events waiting to be applied.
+
+    ``record`` is one small insert, so deliveries are acknowledged without
+    waiting on credit updates. ``apply_batch`` claims a batch of events in
+    ``processed_events`` and grants their credits in a single transaction,
+    deleting them from the inbox as it commits; a crash leaves the batch in
+    the inbox to be applied after restart. Both tables live in the billing
+    database, so a replayed event is never granted twice.
+    """
+
+    def __init__(self, db_path: Path, events: ProcessedEvents):
+        self.db_path = db_path
+        self.events = events
+        self.applied = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self.batches = 0
+        connect(db_path, durable=True).executescript(_SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        return connect(self.db_path, durable=True)
+
+    def record(self, event_id: Optional[str], event_type: str, payload: str) -> bool:
+        """Queue a verified event; returns False if it was already received or applied."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if event_id and self.events.seen(event_id):
+                db.execute("ROLLBACK")
+                return False
+            cur = db.execute(
+                "INSERT OR IGNORE INTO webhook_inbox (event_id, event_type, payload, received_at) VALUES (?, ?, ?, ?)",
+                (event_id or None, event_type, payload, time.time()),
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return cur.rowcount > 0
+
+    def apply_batch(self, limit: int = 500) -> int:
+        """Apply up to ``limit`` queued events in one transaction; returns how many were taken."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute(
+                "SELECT seq, event_id, event_type, payload FROM webhook_inbox ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+            if not rows:
+                db.execute("COMMIT")
+                return 0
+            totals: Dict[str, int] = defaultdict(int)
+            applied = duplicates = dropped = 0
+            for row in rows:
+                if row["event_id"] and not ProcessedEvents.claim_in(db, row["event_id"]):
+                    duplicates += 1
+                    continue
+                try:
+                    grant = dodo_credit_grant(json.loads(row["payload"]))
+                except Exception as e:
+                    # One malformed event must not hold back the rest of the batch
+                    print(f"[Dodo] Dropping unreadable event {row['event_id']}: {type(e).__name__}: {e}")
+                    dropped += 1
+                    continue
+                if grant.credits > 0:
+                    totals[grant.email] += grant.credits
+                elif not grant.email and row["event_type"] in {"payment.completed", "checkout.completed"}:
+                    print("[Dodo] Missing customer email in payload; cannot grant credits")
+                applied += 1
+                print("[Dodo] Webhook applied:", row["event_type"], "plan=", grant.plan, "email=", grant.email,
+                      "granted=", grant.granted)
+            for email, amount in totals.items():
+                CreditsStore.increment_in(db, email, amount)
+            db.execute("DELETE FROM webhook_inbox WHERE seq <= ?", (rows[-1]["seq"],))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self.applied += applied
+        self.duplicates += duplicates
+        self.dropped += dropped
+        self.batches += 1
+        if self.batches % 100 == 0:
+            self.events.expire()
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        row = self._db().execute("SELECT COUNT(*) AS depth, MIN(received_at) AS oldest FROM webhook_inbox").fetchone()
+        return {
+            "depth": row["depth"],
+            "oldest_age_seconds": round(time.time() - row["oldest"], 3) if row["oldest"] else 0.0,
+            "applied": self.applied,
+            "duplicates": self.duplicates,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
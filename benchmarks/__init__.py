@@ -0,0 +1,3 @@
+"""
+Benchmarks for the backend: python -m benchmarks {micro,load,all,compare}
+"""
@@ -0,0 +1,89 @@
+"""
+python -m benchmarks {micro,load,all,import-time,compare} -- see README "Benchmarks"
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks import report
+
+LOAD_ENDPOINTS = ["upload", "analyze", "ask-question", "webhooks"]
+
+
+def _pages(value: str) -> List[int]:
+    return [int(p) for p in value.split(",") if p.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Backend benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for command in ("micro", "load", "all"):
+        p = sub.add_parser(command)
+        p.add_argument("--out", type=Path, help="Report path (default benchmarks/results/<kind>-<commit>-<time>.json)")
+        p.add_argument("--corpus", type=Path, default=Path(tempfile.gettempdir()) / "contract-ai-bench-corpus",
+                       help="Where synthetic documents are generated and reused")
+        p.add_argument("--pages", type=_pages, default=[1, 10, 50, 100, 500], help="Page counts, e.g. 1,10,500")
+        p.add_argument("--requests", type=int, default=200, help="Requests per endpoint (load)")
+        p.add_argument("--concurrency", type=int, default=16, help="Requests in flight (load)")
+        p.add_argument("--latency", type=float, default=0.2, help="Fake Gemini latency in seconds (load)")
+        p.add_argument("--jitter", type=float, default=0.05, help="Extra random fake Gemini latency (load)")
+        p.add_argument("--upload-pages", type=int, default=10, help="Pages per uploaded PDF (load)")
+        p.add_argument("--endpoints", default=",".join(LOAD_ENDPOINTS), help="Subset of " + ",".join(LOAD_ENDPOINTS))
+    imp = sub.add_parser("import-time", help="Cold-start import budget for backend.main")
+    imp.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to measure")
+    imp.add_argument("--budget-ms", type=float, default=1000.0, help="Fail when the median import exceeds this")
+    imp.add_argument("--out", type=Path, help="Report path")
+    cmp = sub.add_parser("compare", help="Compare two reports")
+    cmp.add_argument("baseline", type=Path)
+    cmp.add_argument("candidate", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        report.compare(args.baseline, args.candidate)
+        return 0
+    if args.command == "import-time":
+        from benchmarks import import_time
+
+        results, violations = import_time.run(args.repeat, args.budget_ms)
+        report.print_table(results)
+        for row in results[0]["slowest"]:
+            print(f"  {row['module']:<40} {row['ms']:>8.1f} ms")
+        path = report.write_report("import-time", {"repeat": args.repeat, "budget_ms": args.budget_ms}, results, args.out)
+        print(f"report: {path}", file=sys.stderr)
+        for violation in violations:
+            print(f"FAIL: {violation}", file=sys.stderr)
+        return 1 if violations else 0
+
+    # The app reads these at import time; keep benchmark state out of real data
+    scratch = tempfile.TemporaryDirectory(prefix="contract-ai-bench-")
+    os.environ["APP_DATA_DIR"] = scratch.name
+    os.environ["GEMINI_WARMUP"] = "false"
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ["ANALYSIS_CACHE_DISK"] = "false"
+
+    from benchmarks import fake_gemini, load, micro
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    results = []
+    if args.command in ("micro", "all"):
+        results += micro.run(args.corpus, args.pages)
+    if args.command in ("load", "all"):
+        os.environ["DODO_WEBHOOK_SECRET"] = load.WEBHOOK_SECRET
+        model = fake_gemini.install(fake_gemini.FakeGeminiModel(latency=args.latency, jitter=args.jitter))
+        endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+        results += asyncio.run(load.run(args.requests, args.concurrency, args.upload_pages, endpoints))
+        config["fake_gemini_calls"] = model.calls
+
+    report.print_table(results)
+    path = report.write_report(args.command, config, results, args.out)
+    print(f"report: {path}", file=sys.stderr)
+    scratch.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Synthetic contract corpora (PDF, DOCX, TXT) with a fixed number of pages
+"""
+import random
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+LINES_PER_PAGE = 48
+LINE_CHARS = 90
+
+_PARTIES = ["the Supplier", "the Customer", "the Licensor", "the Licensee", "each Party", "the Contractor"]
+_VERBS = ["shall", "may", "shall not", "must promptly", "agrees to", "is entitled to"]
+_OBJECTS = [
+    "pay all undisputed invoices within thirty (30) days of receipt",
+    "maintain commercially reasonable insurance coverage",
+    "keep Confidential Information secret for five (5) years after termination",
+    "indemnify and hold harmless the other party against third-party claims",
+    "terminate this Agreement on sixty (60) days written notice",
+    "assign this Agreement without prior written consent",
+    "deliver the Services in accordance with the Statement of Work",
+    "limit its aggregate liability to the fees paid in the preceding twelve months",
+    "comply with all applicable data protection laws",
+    "provide monthly service level reports",
+]
+_HEADINGS = [
+    "Definitions", "Services", "Fees and Payment", "Term and Termination", "Confidentiality",
+    "Intellectual Property", "Warranties", "Indemnification", "Limitation of Liability", "Governing Law",
+]
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def contract_pages(pages: int, seed: int = 0) -> List[str]:
+    """Deterministic contract-like text, one string of ~LINES_PER_PAGE lines per page."""
+    rng = random.Random(seed)
+    result = []
+    section = 0
+    for _ in range(pages):
+        lines: List[str] = []
+        while len(lines) < LINES_PER_PAGE:
+            if rng.random() < 0.15:
+                section += 1
+                lines.append(f"{section}. {_HEADINGS[(section - 1) % len(_HEADINGS)].upper()}")
+                continue
+            sentence = " ".join(
+                f"{rng.choice(_PARTIES).capitalize()} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}."
+                for _ in range(rng.randint(1, 3))
+            )
+            lines.extend(_wrap(f"{section}.{rng.randint(1, 9)} {sentence}", LINE_CHARS))
+        result.append("\n".join(lines[:LINES_PER_PAGE]))
+    return result
+
+
+def _pdf_string(line: str) -> bytes:
+    escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return escaped.encode("latin-1", "replace")
+
+
+def write_pdf(path: Path, pages: Sequence[str]) -> Path:
+    """Minimal uncompressed PDF with one Helvetica text stream per page."""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = font + 2 * len(pages) + 1
+    kids = []
+    for text in pages:
+        shows = b"".join(b"(" + _pdf_string(line) + b") Tj T* " for line in text.split("\n"))
+        stream = b"BT /F1 9 Tf 11 TL 40 760 Td " + shows + b"ET"
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content, font)
+        ))
+    add(b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(kids))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def write_docx(path: Path, pages: Sequence[str]) -> Path:
+    from docx import Document
+
+    document = Document()
+    for number, text in enumerate(pages):
+        if number:
+            document.add_page_break()
+        for line in text.split("\n"):
+            document.add_paragraph(line)
+    document.save(str(path))
+    return path
+
+
+def write_txt(path: Path, pages: Sequence[str]) -> Path:
+    path.write_text("\f".join(pages), encoding="utf-8")
+    return path
+
+
+WRITERS = {".pdf": write_pdf, ".docx": write_docx, ".txt": write_txt}
+
+
+def build_corpus(directory: Path, page_counts: Sequence[int], formats: Sequence[str] = (".pdf", ".docx", ".txt")) -> Dict[str, Path]:
+    """Write (or reuse) one file per format and page count; keys look like ``pdf-100``."""
+    directory.mkdir(parents=True, exist_ok=True)
+    files = {}
+    for pages in page_counts:
+        text = None
+        for extension in formats:
+            path = directory / f"contract-{pages}p{extension}"
+            if not path.exists():
+                text = text or contract_pages(pages)
+                WRITERS[extension](path, text)
+            files[f"{extension.lstrip('.')}-{pages}"] = path
+    return files
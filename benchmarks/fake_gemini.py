@@ -0,0 +1,126 @@
+"""
+Local stand-in for the Gemini client with configurable latency and canned responses
+"""
+import json
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+CANNED_ANALYSIS = {
+    "summary": "- Services agreement between Acme Corp and Client Ltd\n- 24 month term with automatic renewal\n"
+    "- Net 30 payment terms with a 1.5% late fee\n- Either party may terminate on 60 days notice",
+    "key_clauses": [
+        {"type": "Payment Terms", "content": "Invoices are payable within 30 days.", "importance": "high"},
+        {"type": "Termination", "content": "Either party may terminate on 60 days notice.", "importance": "high"},
+        {"type": "Confidentiality", "content": "Confidential information survives for 5 years.", "importance": "medium"},
+        {"type": "Liability", "content": "Liability is capped at fees paid in 12 months.", "importance": "high"},
+    ],
+    "risks": [
+        {
+            "risk_type": "Financial Risk",
+            "description": "Late fee of 1.5% per month on overdue invoices.",
+            "severity": "medium",
+            "clause_reference": "Section 4.2",
+        },
+        {
+            "risk_type": "Legal Risk",
+            "description": "Unlimited indemnity for third-party IP claims.",
+            "severity": "high",
+            "clause_reference": "Section 9.1",
+        },
+    ],
+    "risk_score": 55,
+}
+
+CANNED_EMAIL = {
+    "subject": "Proposed changes to the services agreement",
+    "body": "Hello,\n\nThank you for sending the agreement. Before signing we would like to discuss the "
+    "indemnity in Section 9.1 and the late fee in Section 4.2.\n\nBest regards",
+}
+
+CANNED_ANSWER = (
+    "Invoices are payable within 30 days of receipt (Excerpt 2). Overdue amounts accrue a late fee "
+    "of 1.5% per month."
+)
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Mimics ``genai.GenerativeModel`` for the calls the backend makes.
+
+    Each call sleeps for ``latency`` seconds (plus up to ``jitter`` seconds);
+    streamed calls spread the same delay over ``stream_chunks`` deltas. The
+    response is picked from the prompt: analysis JSON, email JSON or a plain
+    answer.
+    """
+
+    model_name = "models/fake-gemini"
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.0, stream_chunks: int = 8, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.stream_chunks = max(1, stream_chunks)
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    @staticmethod
+    def _reply(prompt: str) -> str:
+        if "negotiation email" in prompt:
+            if "Return plain text only" in prompt:
+                return f"Subject: {CANNED_EMAIL['subject']}\n\n{CANNED_EMAIL['body']}"
+            return "```json\n" + json.dumps(CANNED_EMAIL) + "\n```"
+        if "Answer the question" in prompt:
+            return CANNED_ANSWER
+        return "```json\n" + json.dumps(CANNED_ANALYSIS, indent=2) + "\n```"
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        delay = self._delay()
+        text = self._reply(prompt)
+        if not stream:
+            time.sleep(delay)
+            return _Response(text)
+        return self._stream(text, delay)
+
+    def _stream(self, text: str, delay: float) -> Iterator[_Response]:
+        size = max(1, -(-len(text) // self.stream_chunks))
+        for start in range(0, len(text), size):
+            time.sleep(delay / self.stream_chunks)
+            yield _Response(text[start:start + size])
+
+    def count_tokens(self, contents) -> Dict[str, int]:
+        return {"total_tokens": len(str(contents)) // 4}
+
+
+def install(model: Optional[FakeGeminiModel] = None) -> FakeGeminiModel:
+    """Route every backend model call to ``model`` (a fresh fake by default)."""
+    from backend import contract_ai
+
+    model = model or FakeGeminiModel()
+    contract_ai._get_model = lambda: model
+    return model
+
+
+def canned_responses(sizes: List[int]) -> List[str]:
+    """Analysis-shaped model outputs padded to roughly ``sizes`` characters, fenced and bare."""
+    outputs = []
+    for size in sizes:
+        analysis = dict(CANNED_ANALYSIS)
+        clauses: List[Dict[str, str]] = []
+        while len(json.dumps(clauses)) < size:
+            clauses.extend(CANNED_ANALYSIS["key_clauses"])
+        analysis["key_clauses"] = clauses
+        body = json.dumps(analysis, indent=2)
+        outputs.append(body)
+        outputs.append("Here is the analysis:\n```json\n" + body + "\n```\n")
+    return outputs
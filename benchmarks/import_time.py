@@ -0,0 +1,66 @@
+"""
+Cold-start import budget for backend.main (what a fresh serverless worker pays)
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.report import REPO_ROOT, summarize
+
+# Loaded on first use or by the startup pre-warm, never at import time
+LAZY_MODULES = ("google.generativeai", "PyPDF2", "docx")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _probe(data_dir: str) -> Tuple[float, List[str], str]:
+    """Import backend.main in a fresh interpreter; returns (seconds, loaded modules, -X importtime log)."""
+    env = {**os.environ, "APP_DATA_DIR": data_dir, "PYTHONPATH": str(REPO_ROOT), "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result["seconds"], result["modules"], proc.stderr
+
+
+def _slowest(importtime_log: str, top: int) -> List[Dict[str, Any]]:
+    """Top-level modules by cumulative import time, from ``-X importtime`` output."""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and name.startswith("   ") and not name.startswith("    "):
+            rows.append({"module": name.strip(), "ms": round(int(cumulative) / 1000, 1)})
+    return sorted(rows, key=lambda r: r["ms"], reverse=True)[:top]
+
+
+def run(repeat: int = 5, budget_ms: float = 1000.0, top: int = 10) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Measure ``repeat`` cold imports; returns (results, budget violations)."""
+    latencies = []
+    eager: List[str] = []
+    log = ""
+    with tempfile.TemporaryDirectory(prefix="contract-ai-import-") as data_dir:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            seconds, modules, log = _probe(data_dir)
+            latencies.append(seconds)
+            eager = [m for m in LAZY_MODULES if m in modules]
+        wall = time.perf_counter() - started
+    result = summarize("import/backend.main", latencies, wall, budget_ms=budget_ms, slowest=_slowest(log, top))
+
+    violations = [f"{module} is imported at startup" for module in eager]
+    if result["p50_ms"] > budget_ms:
+        violations.append(f"median import time {result['p50_ms']:.0f} ms exceeds the {budget_ms:.0f} ms budget")
+    return [result], violations
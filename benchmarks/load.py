@@ -0,0 +1,121 @@
+"""
+Concurrent load tests of the API in-process (httpx ASGI transport, fake Gemini)
+"""
+import asyncio
+import base64
+import json
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.corpus import contract_pages, write_pdf
+from benchmarks.report import summarize
+
+WEBHOOK_SECRET = "whsec_" + base64.b64encode(b"contract-ai-benchmark-secret").decode()
+
+QUESTIONS = [
+    "When are invoices due?",
+    "How can the agreement be terminated?",
+    "What is the liability cap?",
+    "How long does confidentiality last?",
+    "Who owns the intellectual property?",
+]
+
+
+async def _drive(
+    name: str, send: Callable[[int], Awaitable[Any]], total: int, concurrency: int
+) -> Dict[str, Any]:
+    """Issue ``total`` requests with at most ``concurrency`` in flight and summarize them."""
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async def one(i: int) -> None:
+        async with slots:
+            started = time.perf_counter()
+            try:
+                response = await send(i)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - started
+    errors = sum(n for status, n in statuses.items() if not status.startswith("2"))
+    return summarize(name, latencies, wall, errors=errors, concurrency=concurrency, statuses=dict(statuses))
+
+
+def _signed_headers(body: str, event_id: str) -> Dict[str, str]:
+    from standardwebhooks import Webhook
+
+    now = datetime.now(timezone.utc)
+    return {
+        "content-type": "application/json",
+        "webhook-id": event_id,
+        "webhook-timestamp": str(int(now.timestamp())),
+        "webhook-signature": Webhook(WEBHOOK_SECRET).sign(event_id, now, body),
+    }
+
+
+async def run(total: int, concurrency: int, upload_pages: int, endpoints: List[str]) -> List[Dict[str, Any]]:
+    """Load-test ``endpoints`` against the app in this process.
+
+    The caller must point APP_DATA_DIR at a scratch directory, set
+    DODO_WEBHOOK_SECRET to ``WEBHOOK_SECRET`` and install the fake model
+    before calling.
+    """
+    import httpx
+    from backend.concurrency import shutdown_executors
+    from backend.main import app
+
+    run_id = uuid.uuid4().hex[:8]
+    contract = "\n".join(contract_pages(20, seed=1))
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        if "upload" in endpoints:
+            with tempfile.TemporaryDirectory(prefix="bench-upload-") as scratch:
+                # Distinct documents, so every upload misses the analysis cache
+                uploads = [
+                    write_pdf(Path(scratch) / f"{i}.pdf", contract_pages(upload_pages, seed=1000 + i)).read_bytes()
+                    for i in range(total)
+                ]
+            results.append(await _drive(
+                f"load/upload-{upload_pages}p",
+                lambda i: client.post("/upload", files={"file": (f"contract-{i}.pdf", uploads[i], "application/pdf")}),
+                total, concurrency,
+            ))
+        if "analyze" in endpoints:
+            results.append(await _drive(
+                "load/analyze",
+                lambda i: client.post("/analyze", json={"contract_text": f"{contract}\nReference {run_id}-{i}"}),
+                total, concurrency,
+            ))
+        if "ask-question" in endpoints:
+            results.append(await _drive(
+                "load/ask-question",
+                lambda i: client.post(
+                    "/ask-question",
+                    json={"contract_text": contract, "question": f"{QUESTIONS[i % len(QUESTIONS)]} ({run_id}-{i})"},
+                ),
+                total, concurrency,
+            ))
+        if "webhooks" in endpoints:
+            def webhook(i: int):
+                event_id = f"evt_{run_id}_{i}"
+                body = json.dumps({
+                    "id": event_id,
+                    "type": "payment.completed",
+                    "data": {"customer": {"email": f"bench{i % 50}@example.com"}, "plan": "Pro"},
+                })
+                return client.post("/webhooks/dodo", content=body, headers=_signed_headers(body, event_id))
+
+            results.append(await _drive("load/webhooks-dodo", webhook, total, concurrency))
+    shutdown_executors()
+    return results
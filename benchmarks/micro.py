@@ -0,0 +1,60 @@
+"""
+Micro-benchmarks: text extraction per format and size, and model-output JSON parsing
+"""
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_gemini import canned_responses
+from benchmarks.report import summarize
+
+
+def _time_calls(fn: Callable[[], Any], repeat: int) -> List[float]:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def bench_extraction(corpus_dir: Path, page_counts: Sequence[int], budget_pages: int = 1000) -> List[Dict[str, Any]]:
+    """Time ``extract_text_from_file`` (serial, no pool) for each corpus file.
+
+    Each file is extracted about ``budget_pages / pages`` times (at least once).
+    """
+    from backend.extract import extract_text_from_file
+
+    results = []
+    for name, path in build_corpus(corpus_dir, page_counts).items():
+        pages = int(name.rsplit("-", 1)[1])
+        chars = len(extract_text_from_file(path))  # warm the page cache and imports
+        repeat = max(1, min(50, budget_pages // pages))
+        started = time.perf_counter()
+        latencies = _time_calls(lambda: extract_text_from_file(path), repeat)
+        wall = time.perf_counter() - started
+        results.append(summarize(
+            f"extract/{name}", latencies, wall,
+            pages=pages, bytes=path.stat().st_size, chars=chars,
+            pages_per_s=round(pages * repeat / wall, 1) if wall > 0 else 0.0,
+        ))
+    return results
+
+
+def bench_extract_json(sizes: Sequence[int] = (1000, 10000, 100000), repeat: int = 200) -> List[Dict[str, Any]]:
+    """Time ``_extract_json`` on analysis-shaped outputs, bare and ```json-fenced."""
+    from backend.contract_ai import _extract_json
+
+    outputs = canned_responses(list(sizes))
+    results = []
+    for index, text in enumerate(outputs):
+        label = f"{sizes[index // 2]}c-{'fenced' if index % 2 else 'bare'}"
+        started = time.perf_counter()
+        latencies = _time_calls(lambda: _extract_json(text, "benchmark"), repeat)
+        results.append(summarize(f"extract_json/{label}", latencies, time.perf_counter() - started, chars=len(text)))
+    return results
+
+
+def run(corpus_dir: Path, page_counts: Sequence[int]) -> List[Dict[str, Any]]:
+    return bench_extraction(corpus_dir, page_counts) + bench_extract_json()
@@ -0,0 +1,113 @@
+"""
+Latency summaries and JSON reports tagged with the git commit
+"""
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size so far of this process and of its reaped children (pool workers)."""
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / (1024 * 1024)
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale, 1),
+    }
+
+
+def summarize(name: str, latencies: List[float], wall_seconds: float, errors: int = 0, **extra: Any) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "name": name,
+        "count": count,
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+        "throughput_per_s": round(count / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        **extra,
+    }
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_report(kind: str, config: Dict[str, Any], results: List[Dict[str, Any]], out: Optional[Path] = None) -> Path:
+    env = environment()
+    report = {"kind": kind, "timestamp": time.time(), **env, "config": config, "results": results}
+    if out is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        out = RESULTS_DIR / f"{kind}-{(env['commit'] or 'nogit')[:10]}-{stamp}.json"
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return out
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    print(f"{'benchmark':<32} {'n':>6} {'err':>4} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'per s':>10}")
+    for r in results:
+        print(
+            f"{r['name']:<32} {r['count']:>6} {r['errors']:>4} {r['p50_ms']:>10.2f} "
+            f"{r['p95_ms']:>10.2f} {r['p99_ms']:>10.2f} {r['throughput_per_s']:>10.2f}"
+        )
+    if results:
+        rss = results[-1]["peak_rss_mb"]
+        print(f"peak RSS: {rss['self']} MB (pool workers: {rss['children']} MB)")
+
+
+def compare(baseline_path: Path, candidate_path: Path) -> None:
+    """Print p50/p95/p99 and throughput changes for benchmarks present in both reports."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    candidate = json.loads(candidate_path.read_text(encoding="utf-8"))
+    before = {r["name"]: r for r in baseline["results"]}
+    print(f"baseline  {(baseline.get('commit') or '?')[:10]}  candidate  {(candidate.get('commit') or '?')[:10]}")
+    print(f"{'benchmark':<32} {'p50':>9} {'p95':>9} {'p99':>9} {'per s':>9}")
+
+    def delta(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+8.1f}%" if old else "      n/a"
+
+    for r in candidate["results"]:
+        old = before.get(r["name"])
+        if old is None:
+            continue
+        print(
+            f"{r['name']:<32} {delta(old['p50_ms'], r['p50_ms'])} {delta(old['p95_ms'], r['p95_ms'])} "
+            f"{delta(old['p99_ms'], r['p99_ms'])} {delta(old['throughput_per_s'], r['throughput_per_s'])}"
+        )
@@ -16,4 +16,9 @@ setup(
         'google-generativeai>=0.7.2',
         'standardwebhooks'
     ],
+    entry_points={
+        'console_scripts': [
+            'contract-ai-ingest=backend.ingest:main',
+        ],
+    },
 )
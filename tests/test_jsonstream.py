@@ -0,0 +1,50 @@
+"""
+Streamed analysis parsing: fenced responses split across arbitrary chunk boundaries
+"""
+import json
+
+from backend import contract_ai
+from backend.jsonstream import IncrementalObjectParser
+
+ANALYSIS = {
+    "summary": "- Services agreement {draft}",
+    "key_clauses": [{"type": "Payment Terms", "content": "Net 30", "importance": "high"}],
+    "risks": [
+        {"risk_type": "Financial Risk", "description": "Late fee", "severity": "medium", "clause_reference": "4.2"},
+        {"risk_type": "Legal Risk", "description": "Indemnity", "severity": "high", "clause_reference": "9.1"},
+    ],
+    "risk_score": 55,
+}
+FENCED = "```json\n" + json.dumps(ANALYSIS) + "\n```"
+
+
+def _feed_all(chunks):
+    parser = IncrementalObjectParser(item_fields=("key_clauses", "risks"))
+    events = [event for chunk in chunks for event in parser.feed(chunk)]
+    return parser, events
+
+
+def test_fence_in_its_own_chunk_stays_in_buffer():
+    body = FENCED[: -len("\n```")]
+    parser, events = _feed_all([body, "\n```"])
+    assert parser.done
+    assert [field for field, _ in events] == ["summary", "key_clauses", "risks", "risks", "risk_score"]
+    assert contract_ai._extract_json(parser.buffer, "test") == ANALYSIS
+
+
+def test_one_character_at_a_time():
+    parser, events = _feed_all(list("Here is {the} result:\n" + FENCED))
+    assert dict(events)["summary"] == ANALYSIS["summary"]
+    assert [value for field, value in events if field == "risks"] == ANALYSIS["risks"]
+    assert contract_ai._extract_json(parser.buffer, "test") == ANALYSIS
+
+
+def test_stream_analysis_final_result_matches_streamed_pieces(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(contract_ai, "_analysis_cache", None)
+    monkeypatch.setattr(contract_ai, "_get_model", lambda: None)
+    monkeypatch.setattr(contract_ai, "_generate_stream", lambda model, prompt, operation: iter(FENCED))
+
+    pieces = list(contract_ai.stream_contract_analysis("1. Payment. Invoices are payable within 30 days."))
+    assert [v for f, v in pieces if f == "key_clauses"] == ANALYSIS["key_clauses"]
+    assert pieces[-1] == ("analysis", ANALYSIS)